@@ -1,6 +1,7 @@
 """Configuration management for Miles - fully environment-driven."""
 
 import os
+import re
 
 from dotenv import load_dotenv
 from llm_tools_server import ServerConfig
@@ -9,6 +10,13 @@ from llm_tools_server import ServerConfig
 load_dotenv()
 
 
+def _compile_patterns(patterns: list[str]) -> re.Pattern | None:
+    """Combine regex patterns into a single alternation so a URL is checked with one search."""
+    if not patterns:
+        return None
+    return re.compile("|".join(f"(?:{pattern})" for pattern in patterns))
+
+
 class MilesConfig(ServerConfig):
     """Miles-specific configuration extending ServerConfig."""
 
@@ -23,6 +31,9 @@ class MilesConfig(ServerConfig):
         config.USER_DATA_FILE = os.getenv("USER_DATA_FILE", "data/user.json")
         config.DATA_API_URL = os.getenv("DATA_API_URL", "https://api.askmiles.ai")
 
+        # Tool output settings (compact JSON keeps tool results small for the model)
+        config.TOOL_OUTPUT_PRETTY = os.getenv("TOOL_OUTPUT_PRETTY", "false").lower() == "true"
+
         # WebUI settings
         config.WEBUI_PORT = int(os.getenv("WEBUI_PORT", "8001"))
         config.WEBUI_AUTH = os.getenv("WEBUI_AUTH", "false").lower() == "true"
@@ -34,7 +45,9 @@ class MilesConfig(ServerConfig):
         config.RAG_BM25_WEIGHT = float(os.getenv("RAG_BM25_WEIGHT", "0.4"))
         config.RAG_SEMANTIC_WEIGHT = float(os.getenv("RAG_SEMANTIC_WEIGHT", "0.6"))
         config.RAG_TOP_K = int(os.getenv("RAG_TOP_K", "5"))
+        config.RAG_CANDIDATE_MULTIPLIER = int(os.getenv("RAG_CANDIDATE_MULTIPLIER", "3"))
         config.RAG_RERANK_ENABLED = os.getenv("RAG_RERANK_ENABLED", "true").lower() == "true"
+        config.RAG_RERANK_MODEL = os.getenv("RAG_RERANK_MODEL", "cross-encoder/ms-marco-MiniLM-L-12-v2")
         config.RAG_EMBEDDING_MODEL = os.getenv("RAG_EMBEDDING_MODEL", "sentence-transformers/all-MiniLM-L6-v2")
         config.RAG_MAX_CRAWL_DEPTH = int(os.getenv("RAG_MAX_CRAWL_DEPTH", "2"))
         config.RAG_MAX_PAGES = int(os.getenv("RAG_MAX_PAGES", "500")) if os.getenv("RAG_MAX_PAGES") else None
@@ -63,6 +76,8 @@ class MilesConfig(ServerConfig):
                 ".*/go/.*",  # Go redirect URLs
             ]
         )
+        config.RAG_URL_INCLUDE_RE = _compile_patterns(config.RAG_URL_INCLUDE_PATTERNS)
+        config.RAG_URL_EXCLUDE_RE = _compile_patterns(config.RAG_URL_EXCLUDE_PATTERNS)
 
         return config
 
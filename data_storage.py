@@ -4,11 +4,19 @@ This module handles reading and writing data from local JSON files,
 replacing the Firestore functionality from the cloud version.
 """
 
-import json
+import bisect
+import contextlib
+import copy
+import mmap
 import os
+import re
+from collections import ChainMap
+from collections.abc import Callable, Mapping
 from datetime import UTC, datetime
+from functools import lru_cache
 from typing import Any
 
+import orjson
 from rapidfuzz import fuzz, process
 
 from config import config
@@ -19,32 +27,546 @@ from config import config
 # with accuracy (avoiding false matches)
 FUZZY_MATCH_THRESHOLD = int(os.getenv("FUZZY_MATCH_THRESHOLD", "85"))
 
+# MM/DD/YY dates as used in the card dataset's last_updated field
+_DATE_RE = re.compile(r"(\d{1,2})/(\d{1,2})/(\d{2})")
+
+# Files larger than this are memory-mapped for parsing
+MMAP_THRESHOLD_BYTES = 1024 * 1024
+
+# Parsed JSON files keyed by path: path -> ((mtime_ns, size), data).
+# Entries are reused until the file changes on disk.
+_JSON_CACHE: dict[str, tuple[tuple[int, int], Any]] = {}
+
+# Directories already created by _save_json_file
+_known_dirs: set[str] = set()
+
+# Card lookup structures derived from the parsed credit_cards.json list.
+# Each entry is a new dict, replaced whenever the cached card list is replaced, so readers
+# never see structures built from different card lists.
+_cards_cache: dict[str, Any] = {"entry": None}
+
+# Card search index (see get_card_search_index) for the parsed credit_cards.json list.
+# Replaced whenever the cached card list is replaced.
+_card_search_cache: dict[str, Any] = {"index": None}
+
+# Flattened program_key -> value mapping and normalized name -> program_key index
+# derived from the parsed valuations.json data. Replaced as a whole, like _cards_cache.
+_valuations_cache: dict[str, Any] = {"entry": None}
+
+# Normalized valuation keys for each transfer program and its partners, derived from
+# the parsed transfer_partners.json data, as a (data, keys) pair.
+_transfers_cache: dict[str, Any] = {"entry": None}
+
+# Lowercased program and partner names from the parsed transfer_partners.json data, each
+# joined into one text so a program name query is matched with a single substring scan.
+_transfer_names_cache: dict[str, Any] = {"entry": None}
+
+# Active transfer bonus rows for get_transfer_bonuses, derived from the parsed
+# transfer_partners.json data.
+_transfer_bonuses_cache: dict[str, Any] = {"entry": None}
+
+# orjson-encoded wallet, valuations and credits for the get_user_data tool, keyed by
+# data_version(). Cleared by save_user_data.
+_user_json_cache: dict[str, Any] = {"version": None, "fragments": None}
+
+# Joins the fields of a card's search text so trigrams don't span two fields
+SEARCH_FIELD_SEPARATOR = "\x01"
+
+# Protection and elite status categories in a card's benefits
+PROTECTION_CATEGORIES = ("purchase_protections", "travel_protections", "insurance_protections")
+STATUS_CATEGORIES = ("hotel_elite_status", "airline_elite_status", "rental_car_elite_status", "other_elite_status")
+STATUS_CATEGORY_BITS = {category: 1 << bit for bit, category in enumerate(STATUS_CATEGORIES)}
+
+# Data files read from config.DATA_DIR
+DATA_FILES = ("credit_cards.json", "transfer_partners.json", "valuations.json")
+
+# Shorter queries match too many name fragments for the prefix trie to be useful
+TRIE_MIN_QUERY_LENGTH = 3
+
+
+class _NameTrie:
+    """Radix trie mapping lowercased name fragments to the indices of the names containing them.
+
+    Edges are labelled with strings so unary chains collapse into a single hop, and every
+    node keeps the set of name indices found anywhere below it.
+    """
+
+    __slots__ = ("children", "ids")
+
+    def __init__(self) -> None:
+        self.children: dict[str, tuple[str, _NameTrie]] = {}
+        self.ids: set[int] = set()
+
+    def insert(self, key: str, idx: int) -> None:
+        """Insert a key for the name at idx."""
+        node = self
+        node.ids.add(idx)
+        while key:
+            edge = node.children.get(key[0])
+            if edge is None:
+                child = _NameTrie()
+                child.ids.add(idx)
+                node.children[key[0]] = (key, child)
+                return
+
+            label, child = edge
+            common = 1
+            limit = min(len(label), len(key))
+            while common < limit and label[common] == key[common]:
+                common += 1
+            if common < len(label):
+                # Split the edge so the shared part becomes its own node
+                mid = _NameTrie()
+                mid.ids = set(child.ids)
+                mid.children[label[common]] = (label[common:], child)
+                node.children[key[0]] = (label[:common], mid)
+                child = mid
+
+            child.ids.add(idx)
+            node = child
+            key = key[common:]
+
+    def find_prefix(self, prefix: str) -> set[int]:
+        """Return indices of all names with a key starting with prefix."""
+        node = self
+        while prefix:
+            edge = node.children.get(prefix[0])
+            if edge is None:
+                return set()
+            label, child = edge
+            if prefix.startswith(label):
+                prefix = prefix[len(label) :]
+                node = child
+            elif label.startswith(prefix):
+                return child.ids
+            else:
+                return set()
+        return node.ids
+
+
+def _build_name_trie(names: list[str]) -> _NameTrie:
+    """Index every word-aligned suffix of each name (the full name plus trailing sub-phrases)."""
+    trie = _NameTrie()
+    for idx, name in enumerate(names):
+        tokens = name.split()
+        for start in range(len(tokens)):
+            trie.insert(" ".join(tokens[start:]), idx)
+    return trie
+
+
+def _build_token_index(names: list[str]) -> dict[str, list[int]]:
+    """Map each word of the given names to the indices of the names containing it."""
+    index: dict[str, list[int]] = {}
+    for idx, name in enumerate(names):
+        for token in set(name.split()):
+            index.setdefault(token, []).append(idx)
+    return index
+
+
+@lru_cache(maxsize=32)
+def _data_file_path(data_dir: str, filename: str) -> str:
+    """Build the path of a file in the data directory."""
+    return os.path.join(data_dir, filename)
+
+
+def _parse_json_file(file_path: str) -> tuple[tuple[int, int], Any]:
+    """Read and parse a JSON file from disk.
+
+    Returns the (mtime_ns, size) of the opened file alongside the parsed data, so the cache key
+    always describes the bytes that were actually read. Empty files parse to None.
+    """
+    with open(file_path, "rb") as f:
+        stat = os.fstat(f.fileno())
+        key = (stat.st_mtime_ns, stat.st_size)
+        if not stat.st_size:
+            return key, None
+        # Large files are parsed straight from the page cache instead of being copied into bytes
+        if stat.st_size > MMAP_THRESHOLD_BYTES:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm, memoryview(mm) as view:
+                return key, orjson.loads(view)
+        return key, orjson.loads(f.read())
+
 
 def _load_json_file(file_path: str) -> Any:
-    """Load and parse a JSON file."""
+    """Load and parse a JSON file, reusing the parsed result until the file's mtime or size changes."""
+    # A single stat both validates the cached entry and detects a missing file
     try:
-        with open(file_path, encoding="utf-8") as f:
-            return json.load(f)
+        stat = os.stat(file_path)
     except FileNotFoundError:
         return None
-    except json.JSONDecodeError as e:
+
+    cached = _JSON_CACHE.get(file_path)
+    if cached is not None and cached[0] == (stat.st_mtime_ns, stat.st_size):
+        return cached[1]
+
+    try:
+        key, data = _parse_json_file(file_path)
+    except FileNotFoundError:
+        return None
+    except orjson.JSONDecodeError as e:
         raise ValueError(f"Invalid JSON in {file_path}: {e}") from e
 
+    _JSON_CACHE[file_path] = (key, data)
+    return data
+
 
 def _save_json_file(file_path: str, data: Any) -> None:
-    """Save data to a JSON file."""
-    os.makedirs(os.path.dirname(file_path), exist_ok=True)
-    with open(file_path, "w", encoding="utf-8") as f:
-        json.dump(data, f, indent=2, ensure_ascii=False)
+    """Save data to a JSON file atomically."""
+    directory = os.path.dirname(file_path)
+    if directory not in _known_dirs:
+        os.makedirs(directory, exist_ok=True)
+        _known_dirs.add(directory)
+
+    # Serialize before touching the disk, then write to a sibling temp file and swap it in
+    # so an interrupted write never leaves a truncated file behind
+    content = orjson.dumps(data, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS)
+    tmp_path = file_path + ".tmp"
+    try:
+        with open(tmp_path, "wb") as f:
+            f.write(content)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, file_path)
+    except BaseException:
+        with contextlib.suppress(FileNotFoundError):
+            os.remove(tmp_path)
+        raise
+
+
+def data_version() -> tuple:
+    """Get a key that changes whenever any of the data files or the data location changes.
+
+    Built from the same (mtime_ns, size) stats that validate the parsed file cache, so it
+    costs one stat per file and no reads.
+    """
+    paths = [_data_file_path(config.DATA_DIR, name) for name in DATA_FILES]
+    paths.append(config.USER_DATA_FILE)
+    version = []
+    for path in paths:
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            version.append((path, None))
+        else:
+            version.append((path, (stat.st_mtime_ns, stat.st_size)))
+    return tuple(version)
 
 
 def get_credit_cards() -> list[dict]:
     """Load all credit card data from the local JSON file."""
-    file_path = os.path.join(config.DATA_DIR, "credit_cards.json")
+    file_path = _data_file_path(config.DATA_DIR, "credit_cards.json")
     data = _load_json_file(file_path)
     return data if data is not None else []
 
 
+def _normalize_name(name: str) -> str:
+    """Normalize a card name for lookups: lowercase with runs of whitespace collapsed to one space."""
+    return " ".join(name.lower().split())
+
+
+def _get_card_lookup() -> dict[str, Any]:
+    """Get name lookup structures for the current card list, rebuilding them if the file changed."""
+    cards = get_credit_cards()
+    entry = _cards_cache["entry"]
+    if entry is not None and entry["cards"] is cards:
+        return entry
+
+    # Names are normalized once here so RapidFuzz can skip its per-call preprocessing
+    lower_lookup = {_normalize_name(card["card_name"]): card for card in cards if card.get("card_name")}
+    lower_names = list(lower_lookup)
+    entry = {
+        "cards": cards,
+        "lower_lookup": lower_lookup,
+        "lower_names": lower_names,
+        "name_trie": _build_name_trie(lower_names),
+        "token_index": _build_token_index(lower_names),
+    }
+    _cards_cache["entry"] = entry
+    return entry
+
+
+def _lower(value: Any) -> str:
+    """Lowercase a card field, treating missing or non-string values as empty."""
+    return value.lower() if isinstance(value, str) else ""
+
+
+def _build_search_columns(cards: list[dict]) -> dict[str, list]:
+    """Lowercase the card fields matched by credit_card_search, one list per field.
+
+    List-valued fields hold (lowercased, original) pairs so match reasons can quote the original text.
+    """
+    columns: dict[str, list] = {
+        "card_name": [],
+        "issuer": [],
+        "rewards_currency": [],
+        "card_type": [],
+        "categories": [],
+        "credits": [],
+        "lounges": [],
+    }
+    for card in cards:
+        benefits = card.get("benefits", {})
+        for field in ("card_name", "issuer", "rewards_currency", "card_type"):
+            columns[field].append(_lower(card.get(field)))
+        columns["categories"].append(
+            [(_lower(m.get("category")), m.get("category")) for m in card.get("reward_multipliers", [])]
+        )
+        columns["credits"].append([(_lower(c.get("type")), c.get("type")) for c in benefits.get("credits", [])])
+        columns["lounges"].append([(_lower(lg.get("type")), lg.get("type")) for lg in benefits.get("lounge", [])])
+    return columns
+
+
+def _parse_last_updated(value: Any) -> datetime | None:
+    """Parse an MM/DD/YY last_updated date like datetime.strptime(value, "%m/%d/%y").
+
+    Returns None for missing or invalid dates.
+    """
+    m = _DATE_RE.fullmatch(value) if isinstance(value, str) else None
+    if m is None:
+        return None
+    year = int(m[3])
+    # Same two-digit year pivot as strptime's %y
+    year += 1900 if year >= 69 else 2000
+    try:
+        return datetime(year, int(m[1]), int(m[2]))
+    except ValueError:
+        return None
+
+
+def _search_blob(columns: dict[str, list], idx: int) -> str:
+    """Join the lowercased credit_card_search fields of one card."""
+    return SEARCH_FIELD_SEPARATOR.join(
+        [
+            columns["card_name"][idx],
+            columns["issuer"][idx],
+            columns["rewards_currency"][idx],
+            *(lower for lower, _ in columns["categories"][idx]),
+            *(lower for lower, _ in columns["credits"][idx]),
+            *(lower for lower, _ in columns["lounges"][idx]),
+            columns["card_type"][idx],
+        ]
+    )
+
+
+def _card_benefit_fields(card: dict) -> list[str]:
+    """Fields of a card matched as plain text by benefits_search."""
+    benefits = card.get("benefits", {})
+    protections = benefits.get("protections", {})
+    status = benefits.get("status", {})
+    return [
+        *(credit.get("type", "") for credit in benefits.get("credits", [])),
+        *(lounge.get("type", "") for lounge in benefits.get("lounge", [])),
+        *benefits.get("other", []),
+        *(
+            text
+            for category in PROTECTION_CATEGORIES
+            for prot in protections.get(category, [])
+            for text in (prot.get("type", ""), prot.get("description", ""))
+        ),
+        *(str(stat) for category in STATUS_CATEGORIES for stat in status.get(category, [])),
+    ]
+
+
+def _status_text(stat: Any) -> str:
+    """Lowercased program, tier and description of an elite status entry, as matched by benefits_search."""
+    if not isinstance(stat, dict):
+        return ""
+    return f"{stat.get('program', '')} {stat.get('tier', '')} {stat.get('description', '')}".lower()
+
+
+def _build_benefit_columns(card: dict) -> dict[str, Any]:
+    """Lowercase the benefit text matched by benefits_search, keeping each entry to report the match.
+
+    Protections are (category, lowercased type, lowercased description, entry) tuples; elite
+    status entries are (lowercased status text, lowercased str(entry), entry) per category.
+    """
+    benefits = card.get("benefits", {})
+    protections = benefits.get("protections", {})
+    status = benefits.get("status", {})
+    return {
+        "credits": [(_lower(credit.get("type", "")), credit) for credit in benefits.get("credits", [])],
+        "lounge": [(_lower(lounge.get("type", "")), lounge) for lounge in benefits.get("lounge", [])],
+        "other": [(_lower(other), other) for other in benefits.get("other", [])],
+        "protections": [
+            (category, _lower(prot.get("type", "")), _lower(prot.get("description", "")), prot)
+            for category in PROTECTION_CATEGORIES
+            for prot in protections.get(category, [])
+        ],
+        "status": {
+            category: [(_status_text(stat), str(stat).lower(), stat) for stat in status.get(category, [])]
+            for category in STATUS_CATEGORIES
+        },
+    }
+
+
+def _status_mask(card: dict) -> int:
+    """Combine the STATUS_CATEGORY_BITS of the elite status categories a card has entries in."""
+    status = card.get("benefits", {}).get("status", {})
+    mask = 0
+    for category, bit in STATUS_CATEGORY_BITS.items():
+        if status.get(category):
+            mask |= bit
+    return mask
+
+
+def _card_summary(card: dict) -> dict:
+    """Identifying fields of a card returned by the slim benefits_search response."""
+    return {
+        "card_name": card.get("card_name"),
+        "issuer": card.get("issuer"),
+        "annual_fee": card.get("annual_fee"),
+        "rewards_currency": card.get("rewards_currency"),
+        "card_type": card.get("card_type"),
+    }
+
+
+def _key_benefit_tags(card: dict) -> list[str]:
+    """Short names of a card's credits, lounges, other benefits, protections and elite status, without duplicates."""
+    benefits = card.get("benefits", {})
+    protections = benefits.get("protections", {})
+    status = benefits.get("status", {})
+    tags = [
+        *(credit.get("type") for credit in benefits.get("credits", [])),
+        *(lounge.get("type") for lounge in benefits.get("lounge", [])),
+        *benefits.get("other", []),
+        *(prot.get("type") for category in PROTECTION_CATEGORIES for prot in protections.get(category, [])),
+        *(
+            " ".join(part for part in (stat.get("program"), stat.get("tier")) if isinstance(part, str) and part)
+            for category in STATUS_CATEGORIES
+            for stat in status.get(category, [])
+            if isinstance(stat, dict)
+        ),
+    ]
+    return list(dict.fromkeys(tag for tag in tags if isinstance(tag, str) and tag))
+
+
+def _join_fields(fields: list) -> str:
+    """Lowercase and join the string fields of a card's search text."""
+    return SEARCH_FIELD_SEPARATOR.join(field for field in fields if isinstance(field, str)).lower()
+
+
+def _build_trigram_index(blobs: list[str]) -> dict[str, set[int]]:
+    """Map every three-character substring of the given texts to the indices of the texts containing it."""
+    index: dict[str, set[int]] = {}
+    for idx, blob in enumerate(blobs):
+        for trigram in {blob[i : i + 3] for i in range(len(blob) - 2)}:
+            index.setdefault(trigram, set()).add(idx)
+    return index
+
+
+def _rank_offers(cards: list[dict]) -> dict[str, list[tuple[int, float]]]:
+    """Rank cards by first year value estimate, highest first, overall and per card type.
+
+    Each ranking lists (card index, estimate) for cards with a numeric estimate; ties keep file order.
+    """
+    ranked = []
+    for idx, card in enumerate(cards):
+        fyve = card.get("first_year_value_estimate")
+        if fyve is None:
+            continue
+        try:
+            ranked.append((idx, float(fyve)))
+        except (ValueError, TypeError):
+            continue
+    ranked.sort(key=lambda item: item[1], reverse=True)
+
+    rankings = {"all": ranked}
+    for card_type in ("business", "personal"):
+        rankings[card_type] = [
+            item
+            for item in ranked
+            if isinstance(cards[item[0]].get("card_type"), str) and cards[item[0]]["card_type"].lower() == card_type
+        ]
+    return rankings
+
+
+def _status_blob(benefit_columns: dict[str, Any]) -> str:
+    """Join the lowercased elite status entries of a card's benefit columns."""
+    return SEARCH_FIELD_SEPARATOR.join(
+        stat_repr for entries in benefit_columns["status"].values() for _, stat_repr, _ in entries
+    )
+
+
+# How each card search index entry is derived from the card list and the other entries
+_CARD_INDEX_BUILDERS: dict[str, Callable[[list[dict], dict], Any]] = {
+    "search_columns": lambda cards, index: _build_search_columns(cards),
+    "last_updated": lambda cards, index: [_parse_last_updated(card.get("last_updated")) for card in cards],
+    "search_blobs": lambda cards, index: [_search_blob(index["search_columns"], idx) for idx in range(len(cards))],
+    "search_trigrams": lambda cards, index: _build_trigram_index(index["search_blobs"]),
+    "benefit_columns": lambda cards, index: [_build_benefit_columns(card) for card in cards],
+    "status_masks": lambda cards, index: [_status_mask(card) for card in cards],
+    "status_blobs": lambda cards, index: [_status_blob(columns) for columns in index["benefit_columns"]],
+    "benefit_blobs": lambda cards, index: [_join_fields(_card_benefit_fields(card)) for card in cards],
+    "benefit_trigrams": lambda cards, index: _build_trigram_index(index["benefit_blobs"]),
+    "offer_ranking": lambda cards, index: _rank_offers(cards),
+    "summaries": lambda cards, index: [_card_summary(card) for card in cards],
+    "benefit_tags": lambda cards, index: [_key_benefit_tags(card) for card in cards],
+}
+
+
+class _CardSearchIndex(dict):
+    """Card search structures for one card list, each built the first time it is looked up."""
+
+    def __missing__(self, key: str) -> Any:
+        value = _CARD_INDEX_BUILDERS[key](self["cards"], self)
+        self[key] = value
+        return value
+
+
+def get_card_search_index() -> dict[str, Any]:
+    """Get lowercased search text, trigram indexes, offer rankings and card summaries for the current card list.
+
+    The returned "cards" list is the one the blobs and indexes were built from, so indices
+    from trigram_candidates always refer to it. Each entry is built on first access, so a
+    tool only pays for the structures it uses, and rebuilt only when the file changes.
+    """
+    cards = get_credit_cards()
+    index = _card_search_cache["index"]
+    if index is None or index["cards"] is not cards:
+        index = _CardSearchIndex(cards=cards)
+        _card_search_cache["index"] = index
+    return index
+
+
+def trigram_candidates(trigrams: dict[str, set[int]], query_lower: str) -> list[int] | None:
+    """Get the sorted indices of texts that may contain query_lower as a substring.
+
+    Every trigram of the query must occur in a matching text, so this is a superset of the
+    actual matches. Returns None for queries shorter than three characters, which can't be
+    narrowed this way.
+    """
+    if len(query_lower) < 3:
+        return None
+    postings = [trigrams.get(query_lower[i : i + 3]) for i in range(len(query_lower) - 2)]
+    if not all(postings):
+        return []
+    postings.sort(key=len)
+    return sorted(postings[0].intersection(*postings[1:]))
+
+
+def _match_card_without_fuzzy(card_lookup: dict[str, Any], card_name_lower: str) -> tuple[dict | None, list[int]]:
+    """Resolve a normalized card name by exact match or a unique name prefix.
+
+    A unique prefix must still score FUZZY_MATCH_THRESHOLD, so a short or partial word
+    doesn't resolve to a card on its own. Returns (card, []) when resolved. Otherwise returns
+    (None, candidates) where candidates are the indices of names sharing the query as a
+    word-aligned prefix, or [] when the trie could not narrow the search.
+    """
+    card = card_lookup["lower_lookup"].get(card_name_lower)
+    if card is not None:
+        return card, []
+
+    if len(card_name_lower) < TRIE_MIN_QUERY_LENGTH:
+        return None, []
+
+    ids = card_lookup["name_trie"].find_prefix(card_name_lower)
+    if len(ids) == 1:
+        name = card_lookup["lower_names"][next(iter(ids))]
+        if fuzz.WRatio(card_name_lower, name, processor=None) >= FUZZY_MATCH_THRESHOLD:
+            return card_lookup["lower_lookup"][name], []
+    return None, sorted(ids)
+
+
 def get_credit_card_by_name(card_name: str) -> dict | None:
     """Get a specific credit card by name with fuzzy matching.
 
@@ -53,44 +575,255 @@ def get_credit_card_by_name(card_name: str) -> dict | None:
     - Partial names (e.g., "Amex Platinum" -> "The Platinum Card from American Express")
     - Common abbreviations and informal names
     """
-    cards = get_credit_cards()
-    if not cards:
+    card_lookup = _get_card_lookup()
+    if not card_lookup["lower_names"]:
         return None
 
-    card_name_lower = card_name.lower().strip()
-
-    # Build lookup dict: card_name -> card_data
-    card_lookup = {card.get("card_name", ""): card for card in cards if card.get("card_name")}
-    card_names = list(card_lookup.keys())
-
-    # First, try exact case-insensitive match (fast path)
-    for name in card_names:
-        if card_name_lower == name.lower():
-            return card_lookup[name]
-
-    # Use RapidFuzz for fuzzy matching
-    # WRatio automatically picks the best algorithm based on string lengths
-    result = process.extractOne(
-        card_name,
-        card_names,
-        scorer=fuzz.WRatio,
+    card_name_lower = _normalize_name(card_name)
+
+    # First, try exact case-insensitive match and unique prefix match (fast path)
+    card, candidates = _match_card_without_fuzzy(card_lookup, card_name_lower)
+    if card is not None:
+        return card
+
+    # Otherwise narrow to names sharing at least one word with the query. Queries with no
+    # word in common (abbreviations, typos) still fall back to scoring every name.
+    if not candidates:
+        token_index = card_lookup["token_index"]
+        candidates = sorted(set().union(*(token_index.get(t, ()) for t in card_name_lower.split())))
+
+    # Use RapidFuzz for fuzzy matching, restricted to the candidates when there are any
+    names = card_lookup["lower_names"]
+    choices = [names[i] for i in candidates] if candidates else names
+
+    # Cheap filter first: token_set_ratio over names of comparable length. It scores 100 for
+    # every name containing all the query's words, so it only narrows the choices for WRatio.
+    query_length = len(card_name_lower)
+    max_length_diff = max(query_length, 10)
+    likely = process.extract(
+        card_name_lower,
+        [name for name in choices if abs(len(name) - query_length) <= max_length_diff],
+        scorer=fuzz.token_set_ratio,
+        processor=None,
         score_cutoff=FUZZY_MATCH_THRESHOLD,
+        limit=None,
     )
 
+    # WRatio automatically picks the best algorithm based on string lengths
+    result = None
+    if likely:
+        result = process.extractOne(
+            card_name_lower,
+            [name for name, _score, _ in likely],
+            scorer=fuzz.WRatio,
+            processor=None,
+            score_cutoff=FUZZY_MATCH_THRESHOLD,
+        )
+    if not result:
+        result = process.extractOne(
+            card_name_lower,
+            choices,
+            scorer=fuzz.WRatio,
+            processor=None,
+            score_cutoff=FUZZY_MATCH_THRESHOLD,
+        )
+    if not result and candidates:
+        # The narrowed names can all miss when the query's shared words point at other cards
+        result = process.extractOne(
+            card_name_lower,
+            names,
+            scorer=fuzz.WRatio,
+            processor=None,
+            score_cutoff=FUZZY_MATCH_THRESHOLD,
+        )
+
     if result:
         matched_name, _score, _ = result
-        return card_lookup[matched_name]
+        return card_lookup["lower_lookup"][matched_name]
 
     return None
 
 
 def get_transfer_partners() -> dict:
     """Load transfer partners data from the local JSON file."""
-    file_path = os.path.join(config.DATA_DIR, "transfer_partners.json")
+    file_path = _data_file_path(config.DATA_DIR, "transfer_partners.json")
     data = _load_json_file(file_path)
     return data if data is not None else {}
 
 
+def normalize_program_key(name: str) -> str:
+    """Normalize a program name to the snake_case form used for valuation keys."""
+    return name.lower().replace(" ", "_").replace("-", "_")
+
+
+def get_transfer_valuation_keys() -> dict[str, tuple[str, list[str]]]:
+    """Get the valuation keys of each transfer program and its partners.
+
+    Maps each program in transfer_partners.json to (its normalized key, the normalized key of
+    each partner's loyalty program in order). Rebuilt only when the file changes.
+    """
+    data = get_transfer_partners()
+    entry = _transfers_cache["entry"]
+    if entry is not None and entry[0] is data:
+        return entry[1]
+
+    keys = {
+        prog_key: (
+            normalize_program_key(prog_key),
+            [normalize_program_key(partner.get("Loyalty Program", "")) for partner in partners],
+        )
+        for prog_key, partners in data.items()
+    }
+    _transfers_cache["entry"] = (data, keys)
+    return keys
+
+
+def _join_names(names: list[str]) -> tuple[str, list[int]]:
+    """Lowercase and join names, returning the joined text and the start offset of each name."""
+    starts = []
+    offset = 0
+    lowered = []
+    for name in names:
+        lower = _lower(name)
+        starts.append(offset)
+        lowered.append(lower)
+        offset += len(lower) + len(SEARCH_FIELD_SEPARATOR)
+    return SEARCH_FIELD_SEPARATOR.join(lowered), starts
+
+
+def get_transfer_name_index() -> dict[str, Any]:
+    """Get the joined lowercase program and partner names of the transfer data.
+
+    "program_keys" and "partner_refs" ((program key, partner) pairs) give the name at each
+    index of the corresponding blob. The returned "data" is the transfer data the index was
+    built from. Rebuilt only when the file changes.
+    """
+    data = get_transfer_partners()
+    entry = _transfer_names_cache["entry"]
+    if entry is not None and entry["data"] is data:
+        return entry
+
+    program_keys = list(data)
+    partner_refs = [(prog_key, partner) for prog_key, partners in data.items() for partner in partners]
+    program_blob, program_starts = _join_names(program_keys)
+    partner_blob, partner_starts = _join_names([partner.get("Loyalty Program", "") for _, partner in partner_refs])
+    entry = {
+        "data": data,
+        "program_blob": program_blob,
+        "program_starts": program_starts,
+        "program_keys": program_keys,
+        "partner_blob": partner_blob,
+        "partner_starts": partner_starts,
+        "partner_refs": partner_refs,
+    }
+    _transfer_names_cache["entry"] = entry
+    return entry
+
+
+def match_joined_names(blob: str, starts: list[int], query_lower: str) -> list[int]:
+    """Get the indices, in order, of the names in a joined blob that contain query_lower."""
+    matches: list[int] = []
+    if not query_lower or SEARCH_FIELD_SEPARATOR in query_lower:
+        return matches
+    pos = blob.find(query_lower)
+    while pos != -1:
+        idx = bisect.bisect_right(starts, pos) - 1
+        matches.append(idx)
+        # Resume at the next name so each name is reported once
+        if idx + 1 == len(starts):
+            break
+        pos = blob.find(query_lower, starts[idx + 1])
+    return matches
+
+
+def _transfer_bonus_row(source_program: str, partner: dict) -> dict | None:
+    """Build the get_transfer_bonuses row for a partner, or None if it has no active bonus."""
+    bonus = partner.get("Bonus")
+
+    # Skip if no bonus, bonus is not a number, or bonus is 1.0 or less (no actual bonus)
+    if not isinstance(bonus, (int, float)) or bonus <= 1.0:
+        return None
+
+    ratio = partner.get("Ratio", 1.0)
+    row = {
+        "from_program": source_program,
+        "to_program": partner.get("Loyalty Program", ""),
+        "bonus_multiplier": bonus,
+        "bonus_percentage": f"{(bonus - 1.0) * 100:.0f}%",
+        "normal_ratio": f"{ratio}:1",
+        "effective_ratio": f"{ratio}:{bonus * ratio}",
+        "notes": partner.get("Notes", ""),
+    }
+
+    # Add bonus_expiration if present
+    bonus_exp = partner.get("bonus_expiration")
+    if bonus_exp:
+        row["bonus_expiration"] = bonus_exp
+    return row
+
+
+def get_precomputed_transfer_bonuses() -> dict[str, Any]:
+    """Get the active transfer bonus rows, highest bonus first.
+
+    "rows" holds the formatted rows and "program_indices" the source program of each row as its
+    position in the transfer data, as in get_transfer_name_index()["program_keys"]. Rebuilt
+    only when the file changes; callers must not mutate either list.
+    """
+    data = get_transfer_partners()
+    entry = _transfer_bonuses_cache["entry"]
+    if entry is not None and entry["data"] is data:
+        return entry
+
+    ranked = []
+    for prog_idx, (source_program, partners) in enumerate(data.items()):
+        for partner in partners:
+            row = _transfer_bonus_row(source_program, partner)
+            if row is not None:
+                ranked.append((prog_idx, row))
+    ranked.sort(key=lambda item: item[1]["bonus_multiplier"], reverse=True)
+    entry = {
+        "data": data,
+        "rows": [row for _, row in ranked],
+        "program_indices": [prog_idx for prog_idx, _ in ranked],
+    }
+    _transfer_bonuses_cache["entry"] = entry
+    return entry
+
+
+def _load_valuations() -> tuple[dict[str, float], dict]:
+    """Load valuations.json as (program_key -> value in cents, full data with metadata).
+
+    Both views are rebuilt only when the file changes; callers must not mutate them.
+    """
+    file_path = _data_file_path(config.DATA_DIR, "valuations.json")
+    data = _load_json_file(file_path)
+    entry = _valuations_cache["entry"]
+    if data is not None and entry is not None and entry["data"] is data:
+        return entry["flat"], data
+
+    if data is None:
+        return {}, {"version": "1.0", "unit": "cents_per_point", "valuations": {}}
+
+    valuations = {}
+    index = {}
+    for program_key, val_data in data.get("valuations", {}).items():
+        if isinstance(val_data, dict):
+            # Full object format with value, display_name, category
+            valuations[program_key] = val_data.get("value", 0)
+        elif isinstance(val_data, (int, float)):
+            # Simple value format (backwards compatibility)
+            valuations[program_key] = val_data
+        else:
+            continue
+
+        index[normalize_program_key(program_key)] = program_key
+        if isinstance(val_data, dict) and val_data.get("display_name"):
+            index[normalize_program_key(val_data["display_name"])] = program_key
+
+    _valuations_cache["entry"] = {"data": data, "flat": valuations, "index": index}
+    return valuations, data
+
+
 def get_default_valuations() -> dict[str, float]:
     """Load default point valuations from the valuations.json file.
 
@@ -109,24 +842,14 @@ def get_default_valuations() -> dict[str, float]:
         }
     }
     """
-    file_path = os.path.join(config.DATA_DIR, "valuations.json")
-    data = _load_json_file(file_path)
+    return _load_valuations()[0]
 
-    if data is None:
-        return {}
 
-    valuations = {}
-    raw_valuations = data.get("valuations", {})
-
-    for program_key, val_data in raw_valuations.items():
-        if isinstance(val_data, dict):
-            # Full object format with value, display_name, category
-            valuations[program_key] = val_data.get("value", 0)
-        elif isinstance(val_data, (int, float)):
-            # Simple value format (backwards compatibility)
-            valuations[program_key] = val_data
-
-    return valuations
+def get_valuation_key_index() -> dict[str, str]:
+    """Get a mapping of normalized program keys and display names to default valuation keys."""
+    _, data = _load_valuations()
+    entry = _valuations_cache["entry"]
+    return entry["index"] if entry is not None and entry["data"] is data else {}
 
 
 def get_valuations_with_metadata() -> dict:
@@ -134,49 +857,108 @@ def get_valuations_with_metadata() -> dict:
 
     Returns the complete valuations data structure for rich display.
     """
-    file_path = os.path.join(config.DATA_DIR, "valuations.json")
-    data = _load_json_file(file_path)
-
-    if data is None:
-        return {"version": "1.0", "unit": "cents_per_point", "valuations": {}}
-
-    return data
+    return _load_valuations()[1]
 
 
 def get_user_data() -> dict:
-    """Load user data (wallet, credits, custom valuations) from user.json."""
+    """Load user data (wallet, credits, custom valuations) from user.json.
+
+    The result is the cached parse shared by every reader; don't modify it. Use
+    _get_user_data_for_update to get a copy to change and pass to save_user_data.
+    """
     file_path = config.USER_DATA_FILE
     data = _load_json_file(file_path)
 
     if data is None:
         # Return empty structure if file doesn't exist
         return {
-            "wallet": [],
+            "wallet": {},
             "custom_valuations": {},
             "credits": {},
             "last_updated": datetime.now(UTC).isoformat(),
         }
 
+    # Migrate the legacy list wallet to the dict layout; persisted on the next save
+    if isinstance(data.get("wallet"), list):
+        data["wallet"] = {_normalize_name(entry.get("card_name", "")): entry for entry in data["wallet"]}
+
     return data
 
 
+def _get_user_data_for_update() -> dict:
+    """Get a copy of the user data that can be modified without touching the cached parse."""
+    return copy.deepcopy(get_user_data())
+
+
 def save_user_data(data: dict) -> None:
     """Save user data to user.json."""
-    data["last_updated"] = datetime.now(UTC).isoformat()
-    _save_json_file(config.USER_DATA_FILE, data)
+    data = {**data, "last_updated": datetime.now(UTC).isoformat()}
+    _user_json_cache["version"] = None
+    try:
+        _save_json_file(config.USER_DATA_FILE, data)
+    except BaseException:
+        # The cached parse may have been modified by the caller, so re-read the file next time
+        _JSON_CACHE.pop(config.USER_DATA_FILE, None)
+        raise
+
+    # Seed the cache with what we just wrote so the next read doesn't re-parse it
+    stat = os.stat(config.USER_DATA_FILE)
+    _JSON_CACHE[config.USER_DATA_FILE] = ((stat.st_mtime_ns, stat.st_size), data)
 
 
 def get_user_wallet() -> list[dict]:
     """Get the user's wallet with full card information."""
     user_data = get_user_data()
-    wallet_cards = user_data.get("wallet", [])
+    wallet = user_data.get("wallet", {})
+    if not wallet:
+        return []
+
+    card_lookup = _get_card_lookup()
+    lower_lookup = card_lookup["lower_lookup"]
+    wallet_cards = list(wallet.values())
+    matched_cards: list[dict | None] = [None] * len(wallet_cards)
+
+    # Resolve exact and unique prefix matches directly, collect the rest for fuzzy matching
+    unresolved = []
+    unresolved_names = []
+    unresolved_candidates = []
+    for i, (key, wallet_entry) in enumerate(wallet.items()):
+        # Wallet keys are already normalized card names, so most entries resolve without touching card_name
+        card = lower_lookup.get(key)
+        if card is not None:
+            matched_cards[i] = card
+            continue
+
+        card_name_lower = _normalize_name(wallet_entry.get("card_name", ""))
+        card, candidates = _match_card_without_fuzzy(card_lookup, card_name_lower)
+        if card is not None:
+            matched_cards[i] = card
+        else:
+            unresolved.append(i)
+            unresolved_names.append(card_name_lower)
+            unresolved_candidates.append(candidates)
+
+    # Score all remaining wallet names against all card names in a single batch
+    if unresolved and card_lookup["lower_names"]:
+        scores = process.cdist(
+            unresolved_names,
+            card_lookup["lower_names"],
+            scorer=fuzz.WRatio,
+            processor=None,
+            score_cutoff=FUZZY_MATCH_THRESHOLD,
+            workers=-1,
+        )
+        for i, row, candidates in zip(unresolved, scores, unresolved_candidates):
+            best = candidates[int(row[candidates].argmax())] if candidates else int(row.argmax())
+            if candidates and row[best] < FUZZY_MATCH_THRESHOLD:
+                # No candidate is close enough, so fall back to all names like get_credit_card_by_name
+                best = int(row.argmax())
+            if row[best] >= FUZZY_MATCH_THRESHOLD:
+                matched_cards[i] = lower_lookup[card_lookup["lower_names"][best]]
 
     # Enrich wallet cards with full card data
     enriched_wallet = []
-    for wallet_entry in wallet_cards:
-        card_name = wallet_entry.get("card_name", "")
-        card_data = get_credit_card_by_name(card_name)
-
+    for wallet_entry, card_data in zip(wallet_cards, matched_cards):
         if card_data:
             # Merge wallet entry note with card data
             enriched_card = card_data.copy()
@@ -187,6 +969,14 @@ def get_user_wallet() -> list[dict]:
     return enriched_wallet
 
 
+def get_user_valuations_view() -> Mapping[str, float]:
+    """Get a read-only view of point valuations with the user's custom ones taking precedence.
+
+    Unlike get_user_valuations, this doesn't copy the defaults. Use it when only reading values.
+    """
+    return ChainMap(get_user_data().get("custom_valuations", {}), get_default_valuations())
+
+
 def get_user_valuations() -> dict[str, float]:
     """Get point valuations, merging default valuations with user's custom ones."""
     default_vals = get_default_valuations()
@@ -206,6 +996,20 @@ def get_user_credits() -> dict[str, dict]:
     return user_data.get("credits", {})
 
 
+def get_user_json_fragments() -> tuple[bytes, bytes, bytes]:
+    """Get the user's wallet, valuations and credits as compact JSON, encoded once per data version."""
+    version = data_version()
+    if _user_json_cache["version"] != version:
+        option = orjson.OPT_NON_STR_KEYS
+        _user_json_cache["fragments"] = (
+            orjson.dumps(get_user_wallet(), option=option),
+            orjson.dumps(get_user_valuations(), option=option),
+            orjson.dumps(get_user_credits(), option=option),
+        )
+        _user_json_cache["version"] = version
+    return _user_json_cache["fragments"]
+
+
 def add_card_to_wallet(card_name: str, note: str = "") -> bool:
     """Add a card to the user's wallet."""
     # Verify the card exists
@@ -213,20 +1017,19 @@ def add_card_to_wallet(card_name: str, note: str = "") -> bool:
     if not card:
         return False
 
-    user_data = get_user_data()
-    wallet = user_data.get("wallet", [])
-
-    # Check if card already in wallet
-    for existing_card in wallet:
-        if existing_card.get("card_name", "").lower() == card_name.lower():
-            # Update note if provided
-            if note:
-                existing_card["note"] = note
-            save_user_data(user_data)
-            return True
-
-    # Add new card
-    wallet.append({"card_name": card["card_name"], "note": note})  # Use canonical name from data
+    user_data = _get_user_data_for_update()
+    wallet = user_data.get("wallet", {})
+
+    # Wallet is keyed by the normalized canonical name from data
+    key = _normalize_name(card["card_name"])
+    existing_card = wallet.get(key)
+    if existing_card is not None:
+        # Update note if provided
+        if note:
+            existing_card["note"] = note
+    else:
+        wallet[key] = {"card_name": card["card_name"], "note": note}
+
     user_data["wallet"] = wallet
     save_user_data(user_data)
     return True
@@ -234,16 +1037,10 @@ def add_card_to_wallet(card_name: str, note: str = "") -> bool:
 
 def remove_card_from_wallet(card_name: str) -> bool:
     """Remove a card from the user's wallet."""
-    user_data = get_user_data()
-    wallet = user_data.get("wallet", [])
+    user_data = _get_user_data_for_update()
+    wallet = user_data.get("wallet", {})
 
-    card_name_lower = card_name.lower()
-    original_length = len(wallet)
-
-    # Filter out the card
-    wallet = [c for c in wallet if c.get("card_name", "").lower() != card_name_lower]
-
-    if len(wallet) < original_length:
+    if wallet.pop(_normalize_name(card_name), None) is not None:
         user_data["wallet"] = wallet
         save_user_data(user_data)
         return True
@@ -253,12 +1050,11 @@ def remove_card_from_wallet(card_name: str) -> bool:
 
 def set_custom_valuation(currency: str, value: float) -> None:
     """Set a custom point valuation for a currency."""
-    user_data = get_user_data()
+    user_data = _get_user_data_for_update()
     custom_vals = user_data.get("custom_valuations", {})
 
     # Normalize currency name to snake_case
-    key = currency.lower().replace(" ", "_").replace("-", "_")
-    custom_vals[key] = value
+    custom_vals[normalize_program_key(currency)] = value
 
     user_data["custom_valuations"] = custom_vals
     save_user_data(user_data)
@@ -266,7 +1062,7 @@ def set_custom_valuation(currency: str, value: float) -> None:
 
 def add_merchant_credit(merchant: str) -> None:
     """Add a merchant credit/gift card."""
-    user_data = get_user_data()
+    user_data = _get_user_data_for_update()
     credits = user_data.get("credits", {})
 
     credits[merchant] = {"added_at": datetime.now(UTC).isoformat()}
@@ -277,7 +1073,7 @@ def add_merchant_credit(merchant: str) -> None:
 
 def remove_merchant_credit(merchant: str) -> bool:
     """Remove a merchant credit/gift card."""
-    user_data = get_user_data()
+    user_data = _get_user_data_for_update()
     credits = user_data.get("credits", {})
 
     if merchant in credits:
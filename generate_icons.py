@@ -33,8 +33,20 @@ def generate_icons():
     print(f"Source image size: {img.size}")
     print(f"Source image mode: {img.mode}")
 
-    # Generate each icon size
-    for filename, size in ICONS.items():
+    # Generate each icon size, largest first so smaller sizes can be resampled
+    # from the previous (smaller) result instead of the full-resolution source
+    icons_by_size = {}
+    resample_from = img
+    for filename, size in sorted(ICONS.items(), key=lambda item: item[1], reverse=True):
+        output_path = os.path.join(OUTPUT_DIR, filename)
+
+        # Reuse an already generated icon for duplicate sizes
+        if size in icons_by_size:
+            print(f"Generating {filename} ({size}x{size}) from cached icon...")
+            icons_by_size[size].save(output_path, "PNG", optimize=True)
+            print(f"  ✓ Saved {output_path}")
+            continue
+
         print(f"Generating {filename} ({size}x{size})...")
 
         # Resize image maintaining aspect ratio and centering on transparent background
@@ -51,8 +63,9 @@ def generate_icons():
             new_height = size
             new_width = int(size * img_ratio)
 
-        # Resize source image
-        resized = img.resize((new_width, new_height), Image.Resampling.LANCZOS)
+        # Resize from the smallest image generated so far
+        resized = resample_from.resize((new_width, new_height), Image.Resampling.LANCZOS)
+        resample_from = resized
 
         # Center on transparent background
         x_offset = (size - new_width) // 2
@@ -60,8 +73,8 @@ def generate_icons():
         icon.paste(resized, (x_offset, y_offset), resized if resized.mode == "RGBA" else None)
 
         # Save icon
-        output_path = os.path.join(OUTPUT_DIR, filename)
-        icon.save(output_path, "PNG")
+        icon.save(output_path, "PNG", optimize=True)
+        icons_by_size[size] = icon
         print(f"  ✓ Saved {output_path}")
 
     print("\n✅ All icons generated successfully!")
@@ -1,16 +1,19 @@
 """Miles - A credit card rewards chatbot using LLM API Server."""
 
-import json
+import io
+import mmap
 import os
+import queue
 import signal
 import sys
 import threading
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from pathlib import Path
-from typing import Any
+from typing import TYPE_CHECKING, Any
 
 import click
-import requests
+import orjson
 from dotenv import load_dotenv
 
 # Load .env early so DEBUG_LLM_REQUESTS is available
@@ -18,22 +21,45 @@ load_dotenv()
 
 print("Loading Miles...")
 
-from llm_tools_server import LLMServer
-
 from config import config
-from tools import ALL_TOOLS, get_all_tools, initialize_rag_at_startup
+
+# requests, the server and the tool modules are imported where they are used so
+# `--help` doesn't pay for them
+if TYPE_CHECKING:
+    import requests
 
 # Set up LLM request logging hook if enabled
 if os.getenv("DEBUG_LLM_REQUESTS", "").lower() == "true":
     _request_log_file = os.getenv("DEBUG_LLM_REQUESTS_FILE", "llm_requests.json")
+    # Entries are written by a background thread so LLM calls never wait on disk I/O
+    _request_log_queue: queue.Queue[bytes] = queue.Queue(maxsize=10000)
+    _request_log_dropped = 0
+
+    def _request_log_writer():
+        """Append queued request log lines to the log file, flushing whenever the queue drains."""
+        with open(_request_log_file, "ab") as f:
+            while True:
+                f.write(_request_log_queue.get())
+                if _request_log_queue.empty():
+                    f.flush()
 
     def _log_llm_request(backend: str, payload: dict):
-        """Log LLM request payload to file (JSON Lines format)."""
-        log_entry = {"timestamp": datetime.now().isoformat(), "backend": backend, "payload": payload}
-        with open(_request_log_file, "a") as f:
-            f.write(json.dumps(log_entry, default=str) + "\n")
-        print(f"[DEBUG] LLM request logged to {_request_log_file}")
+        """Queue LLM request payload for logging to file (JSON Lines format)."""
+        global _request_log_dropped
+        log_entry = {
+            "timestamp": datetime.now().isoformat(timespec="milliseconds"),
+            "backend": backend,
+            "payload": payload,
+        }
+        # Serialized here so later changes to the payload can't race with the writer
+        try:
+            _request_log_queue.put_nowait(orjson.dumps(log_entry, default=str) + b"\n")
+        except queue.Full:
+            _request_log_dropped += 1
+            if _request_log_dropped % 1000 == 1:
+                print(f"[DEBUG] LLM request log queue full, {_request_log_dropped} entries dropped")
 
+    threading.Thread(target=_request_log_writer, daemon=True, name="llm-request-log").start()
     config.REQUEST_HOOK = _log_llm_request
     print("[DEBUG] LLM request logging enabled")
 
@@ -41,6 +67,8 @@ if os.getenv("DEBUG_LLM_REQUESTS", "").lower() == "true":
 _server = None
 _update_thread: threading.Thread | None = None
 _shutdown_flag = threading.Event()
+# Contents of .download_cache.json, kept in memory after the first read
+_download_cache: dict | None = None
 
 
 def _validate_credit_cards_data(data: Any) -> bool:
@@ -82,9 +110,30 @@ def _validate_valuations_data(data: Any) -> bool:
     return True
 
 
+def _stream_to_file(response: "requests.Response", file_path: Path) -> None:
+    """Write a streamed response body to file_path chunk by chunk."""
+    with open(file_path, "wb") as f:
+        for chunk in response.iter_content(chunk_size=65536):
+            f.write(chunk)
+
+
+def _load_json_mmap(file_path: Path) -> Any:
+    """Parse a JSON file through a read-only memory map, without copying it into a bytes object."""
+    with open(file_path, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return orjson.loads(b"")
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm, memoryview(mm) as view:
+            return orjson.loads(view)
+
+
+def _data_terms_file() -> Path:
+    """Path of the marker file recording that the data usage terms were accepted."""
+    return Path(config.DATA_DIR) / ".terms_accepted"
+
+
 def check_data_terms_acceptance() -> bool:
     """Check if user has accepted data usage terms."""
-    terms_file = Path(config.DATA_DIR) / ".terms_accepted"
+    terms_file = _data_terms_file()
 
     if terms_file.exists():
         return True
@@ -120,10 +169,102 @@ def check_data_terms_acceptance() -> bool:
         return False
 
 
-def download_data_files():
-    """Download data files from the updater service on startup with smart caching."""
+def _download_dataset(
+    dataset_type: str, file_path: Path, dataset_info: dict, cached_last_modified: str | None
+) -> tuple[str, str, str | None]:
+    """Download, validate and store a single dataset.
+
+    Returns (outcome, message, last_modified) where outcome is "downloaded", "skipped" or
+    "failed" and last_modified is the value to remember for the next conditional request.
+    """
+    import requests
+
+    filename = file_path.name
+    url = f"{config.DATA_API_URL}/api/public/exports/{dataset_type}"
+
+    if dataset_info.get("available") is False:
+        return "skipped", f"  ⊘ Skipped {filename} (not generated on server yet)", None
+
+    headers = {}
+    server_last_modified = dataset_info.get("last_modified")
+
+    if server_last_modified and server_last_modified == cached_last_modified and file_path.exists():
+        return "skipped", f"  ✓ {filename} is up-to-date", None
+
+    if cached_last_modified:
+        try:
+            dt = datetime.fromisoformat(cached_last_modified.replace("Z", "+00:00"))
+            http_date = dt.strftime("%a, %d %b %Y %H:%M:%S GMT")
+            headers["If-Modified-Since"] = http_date
+        except (ValueError, AttributeError):
+            pass
+
+    try:
+        with requests.get(url, headers=headers, timeout=10, stream=True) as response:
+            if response.status_code == 304:
+                return "skipped", f"  ✓ {filename} is up-to-date (304)", None
+
+            response.raise_for_status()
+
+            if filename.endswith(".json"):
+                # Stream to a temp file and only parse it to validate, so the payload
+                # is never held in memory as raw bytes, text and a re-serialized copy
+                tmp_path = file_path.with_suffix(".tmp")
+                try:
+                    _stream_to_file(response, tmp_path)
+
+                    try:
+                        data = _load_json_mmap(tmp_path)
+                    except orjson.JSONDecodeError as e:
+                        return "failed", f"  ⚠ Warning: Invalid JSON in {filename}: {e}", None
+
+                    is_valid = True
+                    if dataset_type == "credit_cards":
+                        is_valid = _validate_credit_cards_data(data)
+                    elif dataset_type == "transfer_partners":
+                        is_valid = _validate_transfer_partners_data(data)
+                    elif dataset_type == "valuations":
+                        is_valid = _validate_valuations_data(data)
+
+                    if not is_valid:
+                        return "failed", f"  ⚠ Warning: {filename} failed validation, keeping existing file", None
+
+                    os.replace(tmp_path, file_path)
+                finally:
+                    tmp_path.unlink(missing_ok=True)
+            else:
+                # Checked on raw bytes so requests never has to detect and decode the charset
+                content = response.content
+                if len(content.strip()) < 10:
+                    return "failed", f"  ⚠ Warning: {filename} appears empty or invalid, keeping existing file", None
+
+                file_path.write_bytes(content)
+
+            timestamp_display = ""
+            if server_last_modified:
+                try:
+                    dt = datetime.fromisoformat(server_last_modified.replace("Z", "+00:00"))
+                    timestamp_display = f" (updated {dt.strftime('%Y-%m-%d %H:%M:%S UTC')})"
+                except (ValueError, AttributeError):
+                    pass
+
+            last_modified = server_last_modified or response.headers.get("Last-Modified")
+            return "downloaded", f"  ↓ Updated {filename}{timestamp_display}", last_modified
+
+    except requests.RequestException as e:
+        return "failed", f"  ⚠ Warning: Failed to download {filename}: {e}", None
+
+
+def download_data_files() -> bool:
+    """Download data files from the updater service on startup with smart caching.
+
+    Returns False if the updater service could not be reached, True otherwise.
+    """
+    global _download_cache
+    import requests
+
     if not check_data_terms_acceptance():
-        return
+        return True
 
     data_files = [
         ("credit_cards", "credit_cards.json"),
@@ -136,13 +277,15 @@ def download_data_files():
 
     cache_file = data_dir / ".download_cache.json"
 
-    # Load cached version info
-    cached_data = {}
-    if cache_file.exists():
-        try:
-            cached_data = json.loads(cache_file.read_text(encoding="utf-8"))
-        except (json.JSONDecodeError, OSError):
-            cached_data = {}
+    # Load cached version info (from disk only on the first check)
+    if _download_cache is None:
+        _download_cache = {}
+        if cache_file.exists():
+            try:
+                _download_cache = orjson.loads(cache_file.read_bytes())
+            except (orjson.JSONDecodeError, OSError):
+                _download_cache = {}
+    cached_data = _download_cache
 
     # Check status endpoint for updates
     status_url = f"{config.DATA_API_URL}/api/public/exports/status"
@@ -151,16 +294,26 @@ def download_data_files():
     offline_mode = False
 
     try:
-        status_response = requests.get(status_url, timeout=10)
+        # Conditional request so an unchanged status costs a 304 without a body
+        status_headers = {}
+        if cached_data.get("status_etag"):
+            status_headers["If-None-Match"] = cached_data["status_etag"]
+        status_response = requests.get(status_url, headers=status_headers, timeout=10)
+
+        if status_response.status_code == 304:
+            print(f"Data files are up-to-date (version: {cached_data.get('version', '')[:8]})")
+            return True
+
         status_response.raise_for_status()
         status_data = status_response.json()
+        status_etag = status_response.headers.get("ETag")
 
         server_version = status_data.get("version", "")
         cached_version = cached_data.get("version", "")
 
         if server_version and server_version == cached_version:
             print(f"Data files are up-to-date (version: {server_version[:8]})")
-            return
+            return True
 
         print("Checking for data file updates...")
         datasets = status_data.get("datasets", {})
@@ -189,144 +342,148 @@ def download_data_files():
             print(f"\n⚠ WARNING: Offline mode and missing data files: {', '.join(missing_files)}")
             print("  Miles may not function correctly without these files.")
             print("  Please check your internet connection and restart the application.")
-        return
+        return False
 
     downloaded_count = 0
     skipped_count = 0
     failed_count = 0
 
-    for dataset_type, filename in data_files:
-        file_path = data_dir / filename
-        url = f"{config.DATA_API_URL}/api/public/exports/{dataset_type}"
-
-        dataset_info = datasets.get(dataset_type, {})
-        if dataset_info.get("available") is False:
-            print(f"  ⊘ Skipped {filename} (not generated on server yet)")
-            skipped_count += 1
-            continue
-
-        headers = {}
-        server_last_modified = dataset_info.get("last_modified")
-        cached_last_modified = cached_data.get("datasets", {}).get(dataset_type, {}).get("last_modified")
-
-        if server_last_modified and server_last_modified == cached_last_modified and file_path.exists():
-            print(f"  ✓ {filename} is up-to-date")
-            skipped_count += 1
-            continue
-
-        if cached_last_modified:
-            try:
-                dt = datetime.fromisoformat(cached_last_modified.replace("Z", "+00:00"))
-                http_date = dt.strftime("%a, %d %b %Y %H:%M:%S GMT")
-                headers["If-Modified-Since"] = http_date
-            except (ValueError, AttributeError):
-                pass
-
-        try:
-            response = requests.get(url, headers=headers, timeout=10)
-
-            if response.status_code == 304:
-                print(f"  ✓ {filename} is up-to-date (304)")
-                skipped_count += 1
-                continue
-
-            response.raise_for_status()
-
-            if filename.endswith(".json"):
-                try:
-                    data = response.json()
-                except json.JSONDecodeError as e:
-                    print(f"  ⚠ Warning: Invalid JSON in {filename}: {e}")
-                    failed_count += 1
-                    continue
-
-                is_valid = True
-                if dataset_type == "credit_cards":
-                    is_valid = _validate_credit_cards_data(data)
-                elif dataset_type == "transfer_partners":
-                    is_valid = _validate_transfer_partners_data(data)
-                elif dataset_type == "valuations":
-                    is_valid = _validate_valuations_data(data)
-
-                if not is_valid:
-                    print(f"  ⚠ Warning: {filename} failed validation, keeping existing file")
-                    failed_count += 1
-                    continue
-
-                file_path.write_text(json.dumps(data, indent=2), encoding="utf-8")
-            else:
-                content = response.text
-                if not content or len(content.strip()) < 10:
-                    print(f"  ⚠ Warning: {filename} appears empty or invalid, keeping existing file")
-                    failed_count += 1
-                    continue
-
-                file_path.write_text(content, encoding="utf-8")
-
-            timestamp_display = ""
-            if server_last_modified:
-                try:
-                    dt = datetime.fromisoformat(server_last_modified.replace("Z", "+00:00"))
-                    timestamp_display = f" (updated {dt.strftime('%Y-%m-%d %H:%M:%S UTC')})"
-                except (ValueError, AttributeError):
-                    pass
-
-            print(f"  ↓ Updated {filename}{timestamp_display}")
+    # Datasets are independent, so fetch them concurrently and report results in a fixed order
+    with ThreadPoolExecutor(max_workers=len(data_files)) as executor:
+        futures = [
+            executor.submit(
+                _download_dataset,
+                dataset_type,
+                data_dir / filename,
+                datasets.get(dataset_type, {}),
+                cached_data.get("datasets", {}).get(dataset_type, {}).get("last_modified"),
+            )
+            for dataset_type, filename in data_files
+        ]
+        results = [future.result() for future in futures]
+
+    for (dataset_type, _), (outcome, message, last_modified) in zip(data_files, results):
+        print(message)
+        if outcome == "downloaded":
             downloaded_count += 1
-
             if "datasets" not in cached_data:
                 cached_data["datasets"] = {}
-            cached_data["datasets"][dataset_type] = {"last_modified": server_last_modified}
-
-            if not server_last_modified and "Last-Modified" in response.headers:
-                cached_data["datasets"][dataset_type] = {"last_modified": response.headers["Last-Modified"]}
-
-        except requests.RequestException as e:
-            print(f"  ⚠ Warning: Failed to download {filename}: {e}")
+            cached_data["datasets"][dataset_type] = {"last_modified": last_modified}
+        elif outcome == "skipped":
+            skipped_count += 1
+        else:
             failed_count += 1
 
     if server_version:
         cached_data["version"] = server_version
+        # Only trust the ETag once every dataset for this version is stored
+        if status_etag and failed_count == 0:
+            cached_data["status_etag"] = status_etag
+        else:
+            cached_data.pop("status_etag", None)
 
     if cached_data.get("datasets"):
         try:
-            cache_file.write_text(json.dumps(cached_data, indent=2), encoding="utf-8")
+            cache_file.write_bytes(orjson.dumps(cached_data, option=orjson.OPT_INDENT_2))
         except OSError as e:
             print(f"  ⚠ Warning: Could not save cache file: {e}")
 
     if downloaded_count > 0 or failed_count > 0:
         print(f"  Summary: {downloaded_count} downloaded, {skipped_count} up-to-date, {failed_count} failed")
 
+    return True
+
 
 def periodic_data_update():
-    """Background thread that checks for data updates every 24 hours."""
+    """Background thread that checks for data updates every 24 hours.
+
+    While the updater service is unreachable, checks back off exponentially from 5 minutes
+    up to the regular 24 hour interval.
+    """
+    import requests
+
     check_interval = 24 * 60 * 60  # 24 hours
+    retry_interval = 5 * 60  # 5 minutes
+    failure_count = 0
+    wait = check_interval
 
     while not _shutdown_flag.is_set():
-        if _shutdown_flag.wait(timeout=check_interval):
+        if _shutdown_flag.wait(timeout=wait):
             break
 
         print("\nChecking for data file updates (scheduled check)...")
         try:
-            download_data_files()
+            reachable = download_data_files()
         except requests.ConnectionError:
-            print("  ⚠ Data updater service is offline, will retry in 24 hours")
+            print("  ⚠ Data updater service is offline")
+            reachable = False
         except Exception as e:
             print(f"  ⚠ Warning: Scheduled data update failed: {e}")
             print("  Will retry in 24 hours")
+            reachable = True
+
+        if reachable:
+            failure_count = 0
+            wait = check_interval
+        else:
+            # The first retry waits retry_interval, then each failure doubles the wait
+            wait = min(check_interval, retry_interval * 2**failure_count)
+            failure_count += 1
+            print(f"  Will retry in {wait // 60} minutes")
+
+
+class _DeferredOutput(io.TextIOBase):
+    """Text stream that holds writes until released, then passes them straight through to stdout."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._pending: list[str] = []
+        self._released = False
+
+    def write(self, text: str) -> int:
+        with self._lock:
+            if self._released:
+                sys.stdout.write(text)
+            else:
+                self._pending.append(text)
+        return len(text)
+
+    def release(self) -> None:
+        """Write the held output and stop holding further writes."""
+        with self._lock:
+            sys.stdout.write("".join(self._pending))
+            self._pending.clear()
+            self._released = True
 
 
 def initialize_miles():
     """Initialization hook called during server startup."""
     global _server, _update_thread
 
-    # Download data files
-    download_data_files()
+    from tools import get_all_tools, initialize_rag_at_startup
 
-    # Initialize RAG index (this creates the doc_search tool)
-    if config.RAG_ENABLED:
-        initialize_rag_at_startup()
-        print()
+    with ThreadPoolExecutor(max_workers=1, thread_name_prefix="RAGInit") as executor:
+        # Loading the RAG index is disk and model bound while the download is network bound, so
+        # they overlap unless the download may first prompt for the data usage terms. The RAG
+        # messages are held until the download's own output is done so the two don't interleave.
+        rag_init = None
+        rag_output = _DeferredOutput()
+        if config.RAG_ENABLED and _data_terms_file().exists():
+            rag_init = executor.submit(initialize_rag_at_startup, rag_output)
+
+        # Download data files
+        try:
+            download_data_files()
+        finally:
+            rag_output.release()
+
+        # Initialize RAG index (this creates the doc_search tool)
+        if config.RAG_ENABLED:
+            if rag_init is None:
+                initialize_rag_at_startup()
+            else:
+                rag_init.result()
+            print()
 
     # Update the server's tools list with the dynamically created doc_search tool
     if _server is not None:
@@ -364,6 +521,10 @@ def main(port: int, backend: str, model: str, no_webui: bool, debug: bool):
     """Start Miles chatbot server."""
     global _server
 
+    from llm_tools_server import LLMServer
+
+    from tools import ALL_TOOLS
+
     # Update config with CLI options
     config.BACKEND_TYPE = backend
     config.BACKEND_MODEL = model
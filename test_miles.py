@@ -6,19 +6,37 @@ with automated validation, reporting, and performance tracking.
 """
 
 import argparse
+import glob
+import hashlib
+import io
+import json
 import os
 import sys
-import webbrowser
+import threading
+import time
+from collections.abc import Callable, Sequence
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
 
-from llm_tools_server.eval import ConsoleReporter, Evaluator, HTMLReporter, JSONReporter, TestCase
+import requests
+from llm_tools_server.eval import ConsoleReporter, Evaluator, TestCase, TestResult
 
 # Test configuration
 DEFAULT_API_URL = "http://localhost:8000"
 DEFAULT_MODEL = "askmiles/miles"
 TEST_TIMEOUT = 180  # seconds per test (complex queries with multiple tool calls can take time)
+DEFAULT_CACHE_DIR = ".eval_cache"
+
+# Files that shape Miles' answers; cached responses are keyed by a digest of their contents
+_DATA_DIR = os.getenv("DATA_DIR", "data")
+CACHE_INPUT_PATTERNS = (
+    "tools.py",
+    "data_storage.py",
+    os.path.join(_DATA_DIR, "*.json"),
+    os.path.join(_DATA_DIR, "system_instruction.md"),
+)
 
 # Test suite - all test cases for Miles
-TEST_CASES = [
+TEST_CASES = (
     TestCase(
         question="can you give me a run down of the credits on the new CSR",
         description="Get detailed credit information for Chase Sapphire Reserve (2025 version)",
@@ -163,7 +181,184 @@ TEST_CASES = [
         timeout=TEST_TIMEOUT,
         metadata={"category": "top_offers", "tool": "get_top_card_offers"},
     ),
-]
+)
+
+
+def print_result(index: int, total: int, test_case: TestCase, result: TestResult) -> None:
+    """Print the outcome of a single test, with failure details, in a single write."""
+    status = "✓ PASSED" if result.passed else "✗ FAILED"
+    status_color = "\033[92m" if result.passed else "\033[91m"
+    reset_color = "\033[0m"
+
+    buf = io.StringIO()
+    buf.write(f"Test {index}/{total}: {test_case.description}\n")
+    buf.write(f'Question: "{test_case.question}"\n')
+    buf.write(f"{status_color}{status}{reset_color} ({result.response_time:.2f}s)\n")
+
+    # Show failure details immediately
+    if not result.passed:
+        if hasattr(result, "validation_errors") and result.validation_errors:
+            for error in result.validation_errors:
+                buf.write(f"  - {error}\n")
+        if hasattr(result, "response") and result.response:
+            buf.write(f"\nResponse:\n{result.response}\n\n")
+
+    buf.write("\n")
+    sys.stdout.write(buf.getvalue())
+    sys.stdout.flush()
+
+
+def checkpoint_entry(index: int, result: TestResult) -> dict:
+    """Build the JSON-serializable checkpoint record for a test result."""
+    return {
+        "test_number": index,
+        "description": result.test_case.description,
+        "question": result.test_case.question,
+        "passed": result.passed,
+        "response_time": result.response_time,
+        "response": result.response,
+        "issues": result.issues,
+        "error": result.error,
+        "tools_used": result.tools_used,
+    }
+
+
+def cache_inputs_digest(base_dir: str = os.path.dirname(os.path.abspath(__file__))) -> str:
+    """Digest the tool code, data files and system instruction, so cached responses expire when any changes."""
+    digest = hashlib.blake2b(digest_size=16)
+    for pattern in CACHE_INPUT_PATTERNS:
+        for path in sorted(glob.glob(os.path.join(base_dir, pattern))):
+            digest.update(os.path.relpath(path, base_dir).encode() + b"\0")
+            with open(path, "rb") as f:
+                digest.update(f.read())
+    return digest.hexdigest()
+
+
+class MilesEvaluator(Evaluator):
+    """Evaluator that runs a batch of test cases concurrently and reports each result as it completes."""
+
+    def __init__(self, *args, workers: int = 1, cache_dir: str | None = None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.workers = workers
+        self.cache_dir = cache_dir
+        self._inputs_digest = cache_inputs_digest() if cache_dir else ""
+        self._local = threading.local()
+
+    def _session(self) -> requests.Session:
+        """Get this thread's HTTP session, so each worker keeps its connection alive across tests."""
+        session = getattr(self._local, "session", None)
+        if session is None:
+            session = requests.Session()
+            session.headers["Content-Type"] = "application/json"
+            self._local.session = session
+        return session
+
+    def _cache_path(self, question: str) -> str:
+        """Get the response cache file for a question to the current model, tools and data."""
+        key = hashlib.blake2b(f"{self.model}|{self._inputs_digest}|{question}".encode(), digest_size=16).hexdigest()
+        return os.path.join(self.cache_dir, f"{key}.json")
+
+    def send_question(self, question: str, timeout: int = 120) -> tuple[str | None, float, str | None, list[str]]:
+        """Send a question to the LLM API, replaying a cached response when one exists.
+
+        Only successful responses are cached. Cached responses are still validated
+        against the current test case.
+        """
+        if not self.cache_dir:
+            return self._post_question(question, timeout)
+
+        cache_path = self._cache_path(question)
+        try:
+            with open(cache_path, encoding="utf-8") as f:
+                cached = json.load(f)
+            return cached["response"], cached["response_time"], None, cached["tools_used"]
+        except (OSError, json.JSONDecodeError, KeyError):
+            pass
+
+        response, response_time, error, tools_used = self._post_question(question, timeout)
+        if error is None:
+            content = json.dumps({"response": response, "response_time": response_time, "tools_used": tools_used})
+            os.makedirs(self.cache_dir, exist_ok=True)
+            tmp_path = f"{cache_path}.{threading.get_ident()}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                f.write(content)
+            os.replace(tmp_path, cache_path)
+
+        return response, response_time, error, tools_used
+
+    def _post_question(self, question: str, timeout: int) -> tuple[str | None, float, str | None, list[str]]:
+        """Send a question to the LLM API over a persistent session.
+
+        Same behavior as Evaluator.send_question, which opens a new connection per request.
+        """
+        try:
+            start_time = time.time()
+
+            payload = {
+                "model": self.model,
+                "messages": [{"role": "user", "content": question}],
+                "stream": self.stream,
+                **self.extra_params,
+            }
+
+            response = self._session().post(f"{self.api_url}/v1/chat/completions", json=payload, timeout=timeout)
+
+            elapsed = time.time() - start_time
+
+            if response.status_code != 200:
+                return None, elapsed, f"HTTP {response.status_code}: {response.text[:500]}", []
+
+            data = response.json()
+            content = data.get("choices", [{}])[0].get("message", {}).get("content", "")
+            tools_used = data.get("tools_used", [])
+
+            if not content:
+                return None, elapsed, "Empty response from API", tools_used
+
+            return content, elapsed, None, tools_used
+
+        except requests.Timeout:
+            return None, timeout, "Request timeout", []
+        except requests.RequestException as e:
+            return None, 0, f"Request error: {e!s}", []
+        except (json.JSONDecodeError, KeyError) as e:
+            return None, 0, f"Response parsing error: {e!s}", []
+
+    def run_tests(
+        self,
+        test_cases: Sequence[TestCase],
+        stop_on_failure: bool = False,
+        on_result: Callable[[int, TestCase, TestResult], None] | None = None,
+    ) -> list[TestResult]:
+        """Run test cases on a thread pool of `workers` threads.
+
+        on_result(test_number, test_case, result) is called from the calling thread as each
+        test completes. Results are returned in the order of test_cases.
+        """
+        results_by_index: dict[int, TestResult] = {}
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            futures = {executor.submit(self.run_test, tc): (i, tc) for i, tc in enumerate(test_cases, 1)}
+            for future in as_completed(futures):
+                index, test_case = futures[future]
+                result = future.result()
+                results_by_index[index] = result
+                if on_result:
+                    on_result(index, test_case, result)
+
+                if stop_on_failure and not result.passed:
+                    # Drop tests that haven't started; running ones finish but aren't reported
+                    for pending in futures:
+                        pending.cancel()
+                    break
+
+        return [results_by_index[i] for i in sorted(results_by_index)]
+
+
+def write_html_report(results: list[TestResult], output_path: str) -> None:
+    """Write the HTML report (module-level so it can run in a worker process)."""
+    from llm_tools_server.eval import HTMLReporter
+
+    HTMLReporter().generate(results, output_path, title="Miles Evaluation Results")
 
 
 def main():
@@ -191,6 +386,27 @@ def main():
         type=int,
         help="Number of tests to run (default: all)",
     )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="Number of tests to run at the same time (default: 1). Response times are measured under this concurrency",
+    )
+    parser.add_argument(
+        "--checkpoint",
+        type=str,
+        help="Append each test result to this JSON Lines file as it completes",
+    )
+    parser.add_argument(
+        "--cache-dir",
+        default=DEFAULT_CACHE_DIR,
+        help=f"Directory for cached responses, keyed by model, question and tool/data version (default: {DEFAULT_CACHE_DIR})",
+    )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Always query the API instead of replaying cached responses",
+    )
     parser.add_argument(
         "--html",
         type=str,
@@ -208,10 +424,12 @@ def main():
     tests_to_run = TEST_CASES[: args.count] if args.count else TEST_CASES
 
     # Initialize evaluator
-    evaluator = Evaluator(
+    evaluator = MilesEvaluator(
         api_url=args.url,
         model=args.model,
         stream=False,
+        workers=args.workers,
+        cache_dir=None if args.no_cache else args.cache_dir,
     )
 
     # Check API health
@@ -220,6 +438,8 @@ def main():
     print(f"\nAPI URL: {args.url}")
     print(f"Model: {args.model}")
     print(f"Tests to run: {len(tests_to_run)}")
+    if evaluator.cache_dir:
+        print(f"Response cache: {evaluator.cache_dir} (use --no-cache to query the API for every test)")
     print("\nChecking API health...")
 
     if not evaluator.check_health():
@@ -231,36 +451,33 @@ def main():
 
     # Run tests with real-time progress
     print("=" * 80)
-    print(f"Running {len(tests_to_run)} Tests")
+    print(f"Running {len(tests_to_run)} Tests ({args.workers} at a time)")
+    if args.workers > 1:
+        print("Note: response times are measured with concurrent requests to the same server")
     print("=" * 80)
     print()
 
-    results = []
-    for i, test_case in enumerate(tests_to_run, 1):
-        print(f"Test {i}/{len(tests_to_run)}: {test_case.description}")
-        print(f'Question: "{test_case.question}"')
-        print("Running...", end="", flush=True)
-
-        # Run single test
-        test_results = evaluator.run_tests([test_case])
-        result = test_results[0]
-        results.append(result)
-
-        # Print result immediately
-        status = "✓ PASSED" if result.passed else "✗ FAILED"
-        status_color = "\033[92m" if result.passed else "\033[91m"
-        reset_color = "\033[0m"
-        print(f"\r{status_color}{status}{reset_color} ({result.response_time:.2f}s)")
-
-        # Show failure details immediately
-        if not result.passed:
-            if hasattr(result, "validation_errors") and result.validation_errors:
-                for error in result.validation_errors:
-                    print(f"  - {error}")
-            if hasattr(result, "response") and result.response:
-                print(f"\nResponse:\n{result.response}\n")
-
-        print()
+    checkpoint = open(args.checkpoint, "a", encoding="utf-8") if args.checkpoint else None  # noqa: SIM115
+
+    def on_result(index: int, test_case: TestCase, result: TestResult) -> None:
+        # Persist each result as soon as it arrives so a crash doesn't lose the run
+        if checkpoint:
+            checkpoint.write(json.dumps(checkpoint_entry(index, result)) + "\n")
+            checkpoint.flush()
+        print_result(index, len(tests_to_run), test_case, result)
+
+    try:
+        results = evaluator.run_tests(tests_to_run, on_result=on_result)
+    finally:
+        if checkpoint:
+            checkpoint.close()
+
+    # Start the HTML report in a separate process so it renders while the rest is reported
+    html_executor = None
+    html_future = None
+    if args.html:
+        html_executor = ProcessPoolExecutor(max_workers=1)
+        html_future = html_executor.submit(write_html_report, results, args.html)
 
     # Generate final summary report
     print("=" * 80)
@@ -268,12 +485,25 @@ def main():
     print("=" * 80)
     console_reporter = ConsoleReporter()
     console_reporter.generate(results)
+    if args.workers > 1:
+        print(f"Response times were measured with up to {args.workers} concurrent requests")
+
+    # Generate JSON report if requested
+    if args.json:
+        from llm_tools_server.eval import JSONReporter
+
+        print(f"\nGenerating JSON report: {args.json}")
+        json_reporter = JSONReporter()
+        json_reporter.generate(results, args.json)
+        print(f"✓ JSON report saved to {args.json}")
+
+    # Wait for the HTML report before opening it
+    if html_executor and html_future:
+        import webbrowser
 
-    # Generate HTML report if requested
-    if args.html:
         print(f"\nGenerating HTML report: {args.html}")
-        html_reporter = HTMLReporter()
-        html_reporter.generate(results, args.html, title="Miles Evaluation Results")
+        with html_executor:
+            html_future.result()
         print(f"✓ HTML report saved to {args.html}")
 
         # Open HTML report in browser
@@ -281,13 +511,6 @@ def main():
         print("Opening report in browser...")
         webbrowser.open(f"file://{html_path}")
 
-    # Generate JSON report if requested
-    if args.json:
-        print(f"\nGenerating JSON report: {args.json}")
-        json_reporter = JSONReporter()
-        json_reporter.generate(results, args.json)
-        print(f"✓ JSON report saved to {args.json}")
-
     # Get summary
     summary = evaluator.get_summary(results)
 
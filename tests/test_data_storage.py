@@ -1,15 +1,46 @@
 """Unit tests for data_storage module."""
 
 import json
+from datetime import datetime
 from unittest import mock
 
+import orjson
 import pytest
 
+import data_storage
+from data_storage import (
+    _build_name_trie,
+    _build_token_index,
+    _load_json_file,
+    _save_json_file,
+    add_card_to_wallet,
+    data_version,
+    get_card_search_index,
+    get_credit_card_by_name,
+    get_default_valuations,
+    get_precomputed_transfer_bonuses,
+    get_transfer_name_index,
+    get_transfer_valuation_keys,
+    get_user_data,
+    get_user_valuations_view,
+    get_user_wallet,
+    get_valuation_key_index,
+    match_joined_names,
+    normalize_program_key,
+    remove_card_from_wallet,
+    save_user_data,
+    set_custom_valuation,
+    trigram_candidates,
+)
+
+pytestmark = pytest.mark.concurrent_safe
+
 
 # Mock config before importing data_storage
 @pytest.fixture(autouse=True)
 def mock_config(tmp_path):
     """Mock config to use temp directory for all tests."""
+    data_storage._JSON_CACHE.clear()
     with mock.patch("data_storage.config") as mock_cfg:
         mock_cfg.DATA_DIR = str(tmp_path)
         mock_cfg.USER_DATA_FILE = str(tmp_path / "user.json")
@@ -36,6 +67,13 @@ class TestLoadJsonFile:
         result = _load_json_file(str(tmp_path / "missing.json"))
         assert result is None
 
+    def test_load_empty_file(self, tmp_path):
+        """Should return None for an empty file."""
+        file_path = tmp_path / "empty.json"
+        file_path.write_text("")
+
+        assert _load_json_file(str(file_path)) is None
+
     def test_load_invalid_json(self, tmp_path):
         """Should raise ValueError for invalid JSON."""
         from data_storage import _load_json_file
@@ -46,6 +84,14 @@ class TestLoadJsonFile:
         with pytest.raises(ValueError, match="Invalid JSON"):
             _load_json_file(str(file_path))
 
+    def test_load_large_json_via_mmap(self, tmp_path):
+        """Should parse files above the mmap threshold."""
+        test_file = tmp_path / "large.json"
+        test_file.write_bytes(orjson.dumps({"key": "value"}))
+
+        with mock.patch("data_storage.MMAP_THRESHOLD_BYTES", 0):
+            assert _load_json_file(str(test_file)) == {"key": "value"}
+
 
 class TestSaveJsonFile:
     """Tests for _save_json_file function."""
@@ -70,6 +116,65 @@ class TestSaveJsonFile:
 
         assert file_path.exists()
 
+    def test_round_trips_non_ascii_as_utf8(self, tmp_path):
+        """Should write UTF-8 bytes that load back to the same data."""
+        file_path = tmp_path / "output.json"
+        data = {"card_name": "Café Rewards Card™", "note": "日本"}
+        _save_json_file(str(file_path), data)
+
+        assert "Café Rewards Card™" in file_path.read_text(encoding="utf-8")
+        assert _load_json_file(str(file_path)) == data
+
+    def test_failed_save_keeps_existing_file(self, tmp_path):
+        """Should leave the previous file intact and remove the temp file if the write fails."""
+        file_path = tmp_path / "output.json"
+        _save_json_file(str(file_path), {"test": 1})
+
+        with mock.patch("data_storage.os.replace", side_effect=OSError("disk full")), pytest.raises(OSError):
+            _save_json_file(str(file_path), {"test": 2})
+
+        assert orjson.loads(file_path.read_bytes()) == {"test": 1}
+        assert not (tmp_path / "output.json.tmp").exists()
+
+
+class TestLoadJsonFileCached:
+    """Tests for _load_json_file caching."""
+
+    def test_reuses_parsed_data_when_unchanged(self, tmp_path):
+        """Should return the same parsed object while the file is unchanged."""
+        file_path = tmp_path / "cached.json"
+        file_path.write_text('{"key": "value"}')
+
+        first = _load_json_file(str(file_path))
+        second = _load_json_file(str(file_path))
+        assert first == {"key": "value"}
+        assert first is second
+
+    def test_reloads_when_file_changes(self, tmp_path):
+        """Should re-parse the file after it is modified."""
+        file_path = tmp_path / "cached.json"
+        file_path.write_text('{"key": "value"}')
+        assert _load_json_file(str(file_path)) == {"key": "value"}
+
+        file_path.write_text('{"key": "changed value"}')
+        assert _load_json_file(str(file_path)) == {"key": "changed value"}
+
+    def test_missing_file_returns_none(self, tmp_path):
+        """Should return None for missing file."""
+        assert _load_json_file(str(tmp_path / "missing.json")) is None
+
+
+class TestDataVersion:
+    """Tests for data_version."""
+
+    def test_changes_when_a_data_file_changes(self, tmp_path):
+        """Should stay the same while files are unchanged and differ once one is written."""
+        before = data_version()
+        assert data_version() == before
+
+        (tmp_path / "transfer_partners.json").write_bytes(orjson.dumps({}))
+        assert data_version() != before
+
 
 class TestGetCreditCards:
     """Tests for get_credit_cards function."""
@@ -124,6 +229,12 @@ class TestGetCreditCardByName:
         assert result is not None
         assert result["issuer"] == "Chase"
 
+    def test_whitespace_insensitive_match(self, sample_cards):
+        """Should match exactly despite extra or irregular whitespace."""
+        result = get_credit_card_by_name("  american   express\tgold card ")
+        assert result is not None
+        assert result["card_name"] == "American Express Gold Card"
+
     def test_fuzzy_match_amex_platinum(self, sample_cards):
         """Should match 'Amex Platinum' to full card name."""
         from data_storage import get_credit_card_by_name
@@ -149,6 +260,23 @@ class TestGetCreditCardByName:
         assert result is not None
         assert result["issuer"] == "Capital One"
 
+    def test_fuzzy_match_without_shared_words(self, sample_cards):
+        """Should still score every name when no query word appears in any card name."""
+        result = get_credit_card_by_name("Chse Saphire Prefered Crdit Crd")
+        assert result is not None
+        assert result["issuer"] == "Chase"
+
+    def test_fuzzy_match_prefers_best_of_shared_suffix(self, tmp_path):
+        """Should pick the closest name, not the first, when several names contain every query word."""
+        cards = [
+            {"card_name": "Business Platinum Card", "issuer": "American Express"},
+            {"card_name": "The Platinum Card", "issuer": "American Express"},
+        ]
+        (tmp_path / "credit_cards.json").write_bytes(orjson.dumps(cards))
+
+        result = get_credit_card_by_name("Platinum Card")
+        assert result["card_name"] == "The Platinum Card"
+
     def test_no_match_returns_none(self, sample_cards):
         """Should return None for completely unrelated name."""
         from data_storage import get_credit_card_by_name
@@ -164,6 +292,184 @@ class TestGetCreditCardByName:
         assert result is None
 
 
+class TestNameTrie:
+    """Tests for the card name prefix trie."""
+
+    def test_finds_names_by_word_aligned_prefix(self):
+        """Should index full names and trailing sub-phrases."""
+        trie = _build_name_trie(["american express gold card", "the platinum card from american express"])
+        assert trie.find_prefix("american exp") == {0, 1}
+        assert trie.find_prefix("gold") == {0}
+        assert trie.find_prefix("platinum card") == {1}
+        assert trie.find_prefix("latinum") == set()
+
+    def test_prefix_resolves_unique_card_without_fuzzy(self, tmp_path):
+        """Should return a card whose name uniquely starts with the query without scoring."""
+        cards = [
+            {"card_name": "Chase Sapphire Preferred Credit Card", "issuer": "Chase"},
+            {"card_name": "Chase Sapphire Reserve", "issuer": "Chase"},
+        ]
+        (tmp_path / "credit_cards.json").write_bytes(orjson.dumps(cards))
+
+        with mock.patch("data_storage.process.extractOne") as extract_one:
+            result = get_credit_card_by_name("Sapphire Res")
+
+        extract_one.assert_not_called()
+        assert result["card_name"] == "Chase Sapphire Reserve"
+
+    def test_unique_prefix_must_pass_threshold(self, tmp_path):
+        """Should not resolve a card from a unique but short prefix that is a poor match."""
+        cards = [{"card_name": "American Express Gold Card", "issuer": "American Express"}]
+        (tmp_path / "credit_cards.json").write_bytes(orjson.dumps(cards))
+
+        assert get_credit_card_by_name("Gol") is None
+
+    def test_falls_back_to_all_names_when_candidates_miss(self, tmp_path, monkeypatch):
+        """Should score every name when the names sharing a query word all fall below the threshold."""
+        cards = [
+            {"card_name": "Chase Sapphire Preferred", "issuer": "Chase"},
+            {"card_name": "American Express Gold Card", "issuer": "American Express"},
+        ]
+        (tmp_path / "credit_cards.json").write_bytes(orjson.dumps(cards))
+        monkeypatch.setattr(data_storage, "FUZZY_MATCH_THRESHOLD", 80)
+
+        result = get_credit_card_by_name("Chse Saphire Prefered Card")
+        assert result["issuer"] == "Chase"
+
+
+class TestTokenIndex:
+    """Tests for the card name word index."""
+
+    def test_maps_words_to_name_indices(self):
+        """Should list each name once per distinct word it contains."""
+        index = _build_token_index(["american express gold card", "the card the platinum card"])
+        assert index["card"] == [0, 1]
+        assert index["gold"] == [0]
+        assert index["the"] == [1]
+        assert "plat" not in index
+
+
+class TestCardSearchIndex:
+    """Tests for the card search text and trigram indexes."""
+
+    def test_trigram_candidates_superset_of_matches(self, tmp_path):
+        """Should narrow to cards whose text contains every trigram of the query."""
+        cards = [
+            {"card_name": "Dining Card", "issuer": "Chase", "benefits": {"other": ["Cell phone protection"]}},
+            {"card_name": "Travel Card", "issuer": "Citi", "reward_multipliers": [{"category": "Dining"}]},
+            {"card_name": "Gas Card", "issuer": "Amex"},
+        ]
+        (tmp_path / "credit_cards.json").write_bytes(orjson.dumps(cards))
+
+        index = get_card_search_index()
+        assert index["cards"] == cards
+        assert index["search_columns"]["issuer"] == ["chase", "citi", "amex"]
+        assert index["search_columns"]["categories"][1] == [("dining", "Dining")]
+        assert trigram_candidates(index["search_trigrams"], "dining") == [0, 1]
+        assert trigram_candidates(index["search_trigrams"], "zzz") == []
+        assert trigram_candidates(index["search_trigrams"], "ca") is None
+        assert trigram_candidates(index["benefit_trigrams"], "phone") == [0]
+        assert get_card_search_index() is index
+
+    def test_entries_built_on_first_access(self, tmp_path):
+        """Should build only the entries that are looked up, and each only once."""
+        (tmp_path / "credit_cards.json").write_bytes(orjson.dumps([{"card_name": "A", "first_year_value_estimate": 1}]))
+
+        index = get_card_search_index()
+        assert "offer_ranking" not in index
+        ranking = index["offer_ranking"]
+        assert index["offer_ranking"] is ranking
+        assert "search_trigrams" not in index
+        assert "benefit_trigrams" not in index
+        with pytest.raises(KeyError):
+            index["unknown"]
+
+    def test_offer_ranking(self, tmp_path):
+        """Should rank cards with a numeric first year value estimate, highest first, per card type."""
+        cards = [
+            {"card_name": "A", "card_type": "Personal", "first_year_value_estimate": "500"},
+            {"card_name": "B", "card_type": "business", "first_year_value_estimate": 900},
+            {"card_name": "C", "card_type": "personal", "first_year_value_estimate": "n/a"},
+            {"card_name": "D", "card_type": "personal"},
+            {"card_name": "E", "card_type": "personal", "first_year_value_estimate": 500},
+        ]
+        (tmp_path / "credit_cards.json").write_bytes(orjson.dumps(cards))
+
+        ranking = get_card_search_index()["offer_ranking"]
+        assert ranking["all"] == [(1, 900.0), (0, 500.0), (4, 500.0)]
+        assert ranking["business"] == [(1, 900.0)]
+        assert ranking["personal"] == [(0, 500.0), (4, 500.0)]
+
+    def test_benefit_columns_lowercase_text(self, tmp_path):
+        """Should pair lowercased benefit text with the original entries in search order."""
+        credit = {"type": "Uber Cash"}
+        prot = {"type": "Cell Phone Protection", "description": "Covers Theft"}
+        stat = {"program": "Hilton", "tier": "Gold"}
+        cards = [
+            {
+                "card_name": "A",
+                "benefits": {
+                    "credits": [credit],
+                    "other": ["Concierge"],
+                    "protections": {"insurance_protections": [prot]},
+                    "status": {"hotel_elite_status": [stat]},
+                },
+            }
+        ]
+        (tmp_path / "credit_cards.json").write_bytes(orjson.dumps(cards))
+
+        columns = get_card_search_index()["benefit_columns"][0]
+        assert columns["credits"] == [("uber cash", credit)]
+        assert columns["lounge"] == []
+        assert columns["other"] == [("concierge", "Concierge")]
+        assert columns["protections"] == [("insurance_protections", "cell phone protection", "covers theft", prot)]
+        assert columns["status"]["hotel_elite_status"] == [("hilton gold ", str(stat).lower(), stat)]
+        assert columns["status"]["airline_elite_status"] == []
+
+    def test_status_masks_and_blobs(self, tmp_path):
+        """Should set one bit per non-empty status category and join the lowercased status entries."""
+        cards = [
+            {
+                "card_name": "A",
+                "benefits": {
+                    "status": {
+                        "hotel_elite_status": [{"program": "Hilton"}],
+                        "airline_elite_status": [],
+                        "other_elite_status": [{"program": "Avis"}],
+                    }
+                },
+            },
+            {"card_name": "B"},
+        ]
+        (tmp_path / "credit_cards.json").write_bytes(orjson.dumps(cards))
+
+        index = get_card_search_index()
+        bits = data_storage.STATUS_CATEGORY_BITS
+        assert index["status_masks"] == [bits["hotel_elite_status"] | bits["other_elite_status"], 0]
+        assert "hilton" in index["status_blobs"][0]
+        assert "avis" in index["status_blobs"][0]
+        assert index["status_blobs"][1] == ""
+
+    def test_last_updated_parsed_once(self, tmp_path):
+        """Should parse MM/DD/YY dates and map missing or invalid dates to None."""
+        cards = [
+            {"card_name": "A", "last_updated": "01/15/25"},
+            {"card_name": "B", "last_updated": "12/31/70"},
+            {"card_name": "C", "last_updated": "2025-01-15"},
+            {"card_name": "D", "last_updated": "02/30/25"},
+            {"card_name": "E"},
+        ]
+        (tmp_path / "credit_cards.json").write_bytes(orjson.dumps(cards))
+
+        assert get_card_search_index()["last_updated"] == [
+            datetime(2025, 1, 15),
+            datetime(1970, 12, 31),
+            None,
+            None,
+            None,
+        ]
+
+
 class TestGetTransferPartners:
     """Tests for get_transfer_partners function."""
 
@@ -184,6 +490,57 @@ class TestGetTransferPartners:
         result = get_transfer_partners()
         assert "programs" in result
 
+    def test_valuation_keys_for_programs_and_partners(self, tmp_path):
+        """Should normalize each program and partner name to its valuation key."""
+        data = {"Chase Ultimate Rewards": [{"Loyalty Program": "Air France-KLM Flying Blue"}, {}]}
+        (tmp_path / "transfer_partners.json").write_bytes(orjson.dumps(data))
+
+        keys = get_transfer_valuation_keys()
+        assert keys == {"Chase Ultimate Rewards": ("chase_ultimate_rewards", ["air_france_klm_flying_blue", ""])}
+        assert get_transfer_valuation_keys() is keys
+
+    def test_name_index_matches_substrings(self, tmp_path):
+        """Should report each program or partner name containing the query once, in data order."""
+        data = {
+            "Chase Ultimate Rewards": [{"Loyalty Program": "Air France"}, {"Loyalty Program": "United"}],
+            "Amex Membership Rewards": [{"Loyalty Program": "Air Canada"}],
+        }
+        (tmp_path / "transfer_partners.json").write_bytes(orjson.dumps(data))
+
+        names = get_transfer_name_index()
+        assert names["data"] == data
+        assert match_joined_names(names["program_blob"], names["program_starts"], "rewards") == [0, 1]
+        assert match_joined_names(names["program_blob"], names["program_starts"], "amex") == [1]
+        matched = match_joined_names(names["partner_blob"], names["partner_starts"], "air")
+        assert [names["partner_refs"][idx][0] for idx in matched] == [
+            "Chase Ultimate Rewards",
+            "Amex Membership Rewards",
+        ]
+        assert match_joined_names(names["partner_blob"], names["partner_starts"], "ce\x01un") == []
+        assert get_transfer_name_index() is names
+
+    def test_precomputed_bonuses_skip_inactive_and_sort(self, tmp_path):
+        """Should keep only numeric bonuses above 1.0, highest first, with formatted ratios."""
+        data = {
+            "Chase": [
+                {"Loyalty Program": "United", "Ratio": 1.0, "Bonus": 1.25, "bonus_expiration": "12/31/25"},
+                {"Loyalty Program": "Hyatt", "Bonus": "Varies"},
+                {"Loyalty Program": "Marriott", "Bonus": 1.0},
+            ],
+            "Amex": [{"Loyalty Program": "Hilton", "Ratio": 2.0, "Bonus": 1.5, "Notes": "Limited"}],
+        }
+        (tmp_path / "transfer_partners.json").write_bytes(orjson.dumps(data))
+
+        bonuses = get_precomputed_transfer_bonuses()
+        rows = bonuses["rows"]
+        assert [row["to_program"] for row in rows] == ["Hilton", "United"]
+        assert bonuses["program_indices"] == [1, 0]
+        assert rows[0]["bonus_percentage"] == "50%"
+        assert rows[0]["effective_ratio"] == "2.0:3.0"
+        assert rows[1]["bonus_expiration"] == "12/31/25"
+        assert "bonus_expiration" not in rows[0]
+        assert get_precomputed_transfer_bonuses() is bonuses
+
 
 class TestGetDefaultValuations:
     """Tests for get_default_valuations parsing."""
@@ -265,6 +622,36 @@ class TestGetDefaultValuations:
         assert "chase_ultimate_rewards" in result["valuations"]
         assert result["valuations"]["chase_ultimate_rewards"]["display_name"] == "Chase Ultimate Rewards"
 
+    def test_valuation_key_index(self, tmp_path):
+        """Should map normalized keys and display names to valuation keys."""
+        content = {
+            "valuations": {
+                "chase_ultimate_rewards": {"value": 1.5, "display_name": "Chase UR Points"},
+                "world_of_hyatt": 1.8,
+            }
+        }
+        (tmp_path / "valuations.json").write_bytes(orjson.dumps(content))
+
+        index = get_valuation_key_index()
+        assert index["chase_ultimate_rewards"] == "chase_ultimate_rewards"
+        assert index[normalize_program_key("Chase UR Points")] == "chase_ultimate_rewards"
+        assert index["world_of_hyatt"] == "world_of_hyatt"
+
+    def test_valuation_key_index_missing_file(self, tmp_path):
+        """Should return an empty index if file missing."""
+        assert get_valuation_key_index() == {}
+
+    def test_flattened_valuations_reused_until_file_changes(self, tmp_path):
+        """Should flatten valuations.json once and rebuild only after it changes."""
+        file_path = tmp_path / "valuations.json"
+        file_path.write_bytes(orjson.dumps({"valuations": {"chase_ur": {"value": 1.5}}}))
+
+        first = get_default_valuations()
+        assert get_default_valuations() is first
+
+        file_path.write_bytes(orjson.dumps({"valuations": {"chase_ur": {"value": 1.75}}}))
+        assert get_default_valuations() == {"chase_ur": 1.75}
+
 
 class TestUserData:
     """Tests for user data functions."""
@@ -277,20 +664,144 @@ class TestUserData:
         assert "wallet" in result
         assert "custom_valuations" in result
         assert "credits" in result
-        assert result["wallet"] == []
+        assert result["wallet"] == {}
 
     def test_save_and_load_user_data(self, tmp_path):
         """Should save and load user data correctly."""
         from data_storage import get_user_data, save_user_data
 
-        data = {"wallet": [{"card_name": "Test Card"}], "custom_valuations": {"test": 1.5}, "credits": {}}
+        data = {"wallet": {"test card": {"card_name": "Test Card"}}, "custom_valuations": {"test": 1.5}, "credits": {}}
         save_user_data(data)
 
         result = get_user_data()
-        assert result["wallet"] == [{"card_name": "Test Card"}]
+        assert result["wallet"] == {"test card": {"card_name": "Test Card"}}
         assert result["custom_valuations"]["test"] == 1.5
         assert "last_updated" in result
 
+    def test_save_seeds_cache(self, tmp_path):
+        """Should serve the saved data without re-reading user.json."""
+        data = {"wallet": {"test card": {"card_name": "Test Card"}}, "custom_valuations": {}, "credits": {}}
+        save_user_data(data)
+
+        with mock.patch("data_storage._parse_json_file") as load:
+            assert get_user_data()["wallet"] == data["wallet"]
+        load.assert_not_called()
+
+    def test_failed_save_leaves_cache_matching_disk(self, tmp_path):
+        """Should not keep a mutation in the cache when writing user.json fails."""
+        set_custom_valuation("chase_ur", 1.5)
+
+        with mock.patch("data_storage._save_json_file", side_effect=OSError("disk full")), pytest.raises(OSError):
+            set_custom_valuation("chase_ur", 3.0)
+
+        assert get_user_data()["custom_valuations"] == {"chase_ur": 1.5}
+
+    def test_migrates_legacy_list_wallet(self, tmp_path):
+        """Should convert a list wallet to the dict layout keyed by lowercased name."""
+        legacy = {"wallet": [{"card_name": "Test Card", "note": "old"}], "custom_valuations": {}, "credits": {}}
+        (tmp_path / "user.json").write_bytes(orjson.dumps(legacy))
+
+        result = get_user_data()
+        assert result["wallet"] == {"test card": {"card_name": "Test Card", "note": "old"}}
+
+
+class TestWalletMutations:
+    """Tests for adding and removing wallet cards."""
+
+    @pytest.fixture
+    def sample_cards(self, tmp_path):
+        """Create sample credit cards file."""
+        cards = [{"card_name": "American Express Gold Card", "issuer": "American Express"}]
+        (tmp_path / "credit_cards.json").write_bytes(orjson.dumps(cards))
+        return cards
+
+    def test_add_uses_canonical_name_and_updates_note(self, sample_cards):
+        """Should key by canonical name so re-adding updates the existing entry."""
+        assert add_card_to_wallet("american express gold card", "dining")
+        assert add_card_to_wallet("AMERICAN EXPRESS GOLD CARD", "groceries")
+
+        wallet = get_user_data()["wallet"]
+        assert wallet == {
+            "american express gold card": {"card_name": "American Express Gold Card", "note": "groceries"}
+        }
+
+    def test_remove_card(self, sample_cards):
+        """Should remove a card by case-insensitive name."""
+        add_card_to_wallet("American Express Gold Card")
+        assert remove_card_from_wallet("american express gold card")
+        assert not remove_card_from_wallet("american express gold card")
+        assert get_user_data()["wallet"] == {}
+
+
+class TestGetUserWallet:
+    """Tests for get_user_wallet enrichment."""
+
+    def test_enriches_exact_and_fuzzy_names(self, tmp_path):
+        """Should resolve exact and fuzzy wallet names to full card data."""
+        cards = [
+            {"card_name": "Chase Sapphire Preferred Credit Card", "issuer": "Chase"},
+            {"card_name": "The Platinum Card from American Express", "issuer": "American Express"},
+        ]
+        (tmp_path / "credit_cards.json").write_bytes(orjson.dumps(cards))
+        save_user_data(
+            {
+                "wallet": [
+                    {"card_name": "chase sapphire preferred credit card", "note": "travel"},
+                    {"card_name": "Amex Platinum", "note": ""},
+                    {"card_name": "ZZZZZ QQQQQ XXXXX", "note": ""},
+                ],
+                "custom_valuations": {},
+                "credits": {},
+            }
+        )
+
+        result = get_user_wallet()
+        assert [c["issuer"] for c in result] == ["Chase", "American Express"]
+        assert result[0]["user_note"] == "travel"
+        assert "user_note" not in result[1]
+
+    def test_resolves_by_wallet_key(self, tmp_path):
+        """Should match a wallet key against card names without normalizing the entry's card_name."""
+        cards = [{"card_name": "American Express Gold Card", "issuer": "American Express"}]
+        (tmp_path / "credit_cards.json").write_bytes(orjson.dumps(cards))
+        save_user_data(
+            {
+                "wallet": {"american express gold card": {"card_name": "American Express Gold Card", "note": ""}},
+                "custom_valuations": {},
+                "credits": {},
+            }
+        )
+
+        with mock.patch("data_storage._normalize_name", wraps=data_storage._normalize_name) as normalize:
+            result = get_user_wallet()
+
+        assert [c["card_name"] for c in result] == ["American Express Gold Card"]
+        # Only the card list itself is normalized (once, when its lookup is built)
+        assert normalize.call_count == len(cards)
+
+    def test_falls_back_to_all_names_when_candidates_miss(self, tmp_path, monkeypatch):
+        """Should score every name when the names sharing the wallet name as a prefix fall below the threshold."""
+        cards = [
+            {"card_name": "Chase Sapphire Preferred Card", "issuer": "Chase"},
+            {"card_name": "Chase Sapphire", "issuer": "Chase (legacy)"},
+        ]
+        (tmp_path / "credit_cards.json").write_bytes(orjson.dumps(cards))
+        # "chase sapphire p" prefixes only the first name, which scores 90; the second scores 95
+        monkeypatch.setattr(data_storage, "FUZZY_MATCH_THRESHOLD", 91)
+        save_user_data(
+            {
+                "wallet": [{"card_name": "Chase Sapphire P", "note": ""}],
+                "custom_valuations": {},
+                "credits": {},
+            }
+        )
+
+        assert [c["issuer"] for c in get_user_wallet()] == ["Chase (legacy)"]
+
+    def test_empty_wallet(self, tmp_path):
+        """Should return empty list when wallet is empty."""
+        assert get_user_wallet() == []
+
 
 class TestUserValuations:
     """Tests for get_user_valuations merging."""
@@ -316,3 +827,15 @@ class TestUserValuations:
         result = get_user_valuations()
         assert result["chase_ur"] == 2.00  # Custom override
         assert result["amex_mr"] == 1.75  # Default preserved
+
+    def test_view_prefers_custom_without_copying(self, tmp_path):
+        """Should expose custom overrides over defaults as a read-only view."""
+        default_valuations = {"valuations": {"chase_ur": 1.80, "amex_mr": 1.75}}
+        (tmp_path / "valuations.json").write_bytes(orjson.dumps(default_valuations))
+        save_user_data({"wallet": {}, "custom_valuations": {"chase_ur": 2.00}, "credits": {}})
+
+        result = get_user_valuations_view()
+        assert result["chase_ur"] == 2.00
+        assert result["amex_mr"] == 1.75
+        assert result.get("unknown", 1.0) == 1.0
+        assert dict(result) == {"chase_ur": 2.00, "amex_mr": 1.75}
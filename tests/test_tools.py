@@ -1,131 +1,163 @@
 """Unit tests for tools module."""
 
-import json
+import os
+import threading
+import time
 from datetime import datetime, timedelta
+from functools import cache
+from types import SimpleNamespace
 from unittest import mock
 
+import orjson
 import pytest
-
-
-# Mock config before importing tools
-@pytest.fixture(autouse=True)
-def mock_config(tmp_path):
-    """Mock config to use temp directory for all tests."""
-    with mock.patch("data_storage.config") as mock_cfg:
-        mock_cfg.DATA_DIR = str(tmp_path)
-        mock_cfg.USER_DATA_FILE = str(tmp_path / "user.json")
-        yield mock_cfg
+from pydantic import ValidationError
+
+import data_storage
+import tools
+from tools import MILES_TOOLS, credit_card_search, get_valuations
+
+_TOOL_NAMES = frozenset(t.name for t in MILES_TOOLS)
+
+# Cards with last_updated dates at fixed ages, built once per module load
+_TODAY = datetime.now().date()
+
+
+def _days_ago(days: int) -> str:
+    """Format the date the given number of days before today as the dataset's MM/DD/YY."""
+    d = _TODAY - timedelta(days=days)
+    return f"{d.month:02d}/{d.day:02d}/{d.year % 100:02d}"
+
+
+SAMPLE_CARDS = [
+    {
+        "card_name": "Recently Updated Card",
+        "issuer": "Chase",
+        "last_updated": _days_ago(5),
+        "rewards_currency": "Ultimate Rewards",
+    },
+    {
+        "card_name": "Month Old Card",
+        "issuer": "Amex",
+        "last_updated": _days_ago(45),
+        "rewards_currency": "Membership Rewards",
+    },
+    {
+        "card_name": "Old Card",
+        "issuer": "Capital One",
+        "last_updated": _days_ago(120),
+        "rewards_currency": "Miles",
+    },
+    {
+        "card_name": "Very Old Card",
+        "issuer": "Citi",
+        "last_updated": _days_ago(200),
+        "rewards_currency": "ThankYou Points",
+    },
+    {
+        "card_name": "Card Without Date",
+        "issuer": "Discover",
+        "rewards_currency": "Cash Back",
+    },
+]
+
+
+@cache
+def _schema(args_schema: type) -> dict:
+    """JSON schema of a tool's argument model, generated once per model."""
+    return args_schema.model_json_schema()
+
+
+@pytest.fixture(scope="module")
+def data_dir(tmp_path_factory):
+    """Data directory shared by every test in this module; the tools only read from it."""
+    return tmp_path_factory.mktemp("fixtures")
+
+
+# Tools read config lazily, so patching it after importing them above is enough. The patch
+# only sets fixed paths, so one patch serves every test in the module.
+@pytest.fixture(autouse=True, scope="module")
+def mock_config(data_dir):
+    """Swap in a plain config pointing at the shared data directory for all tests."""
+    cfg = SimpleNamespace(DATA_DIR=str(data_dir), USER_DATA_FILE=str(data_dir / "user.json"))
+    with mock.patch("data_storage.config", cfg):
+        yield cfg
+
+
+@pytest.fixture
+def tmp_data_dir(tmp_path):
+    """Point the config at a per-test data directory and start with an empty tool result cache."""
+    tools._result_cache.clear()
+    cfg = SimpleNamespace(DATA_DIR=str(tmp_path), USER_DATA_FILE=str(tmp_path / "user.json"))
+    with mock.patch("data_storage.config", cfg):
+        yield tmp_path
+    tools._result_cache.clear()
 
 
 class TestCreditCardSearchRecentlyUpdated:
     """Tests for credit_card_search recently_updated filter."""
 
-    @pytest.fixture
-    def sample_cards_with_dates(self, tmp_path):
-        """Create sample credit cards with various last_updated dates."""
-        today = datetime.now()
-        cards = [
-            {
-                "card_name": "Recently Updated Card",
-                "issuer": "Chase",
-                "last_updated": (today - timedelta(days=5)).strftime("%m/%d/%y"),
-                "rewards_currency": "Ultimate Rewards",
-            },
-            {
-                "card_name": "Month Old Card",
-                "issuer": "Amex",
-                "last_updated": (today - timedelta(days=45)).strftime("%m/%d/%y"),
-                "rewards_currency": "Membership Rewards",
-            },
-            {
-                "card_name": "Old Card",
-                "issuer": "Capital One",
-                "last_updated": (today - timedelta(days=120)).strftime("%m/%d/%y"),
-                "rewards_currency": "Miles",
-            },
-            {
-                "card_name": "Very Old Card",
-                "issuer": "Citi",
-                "last_updated": (today - timedelta(days=200)).strftime("%m/%d/%y"),
-                "rewards_currency": "ThankYou Points",
-            },
-            {
-                "card_name": "Card Without Date",
-                "issuer": "Discover",
-                "rewards_currency": "Cash Back",
-            },
-        ]
-        (tmp_path / "credit_cards.json").write_text(json.dumps(cards))
-        return cards
-
-    def test_recently_updated_30_days(self, sample_cards_with_dates):
-        """Should filter to cards updated in last 30 days."""
-        from tools import credit_card_search
-
-        result = json.loads(credit_card_search.invoke({"query": "card", "recently_updated": 30}))
+    @pytest.fixture(scope="module")
+    def sample_cards_with_dates(self, data_dir):
+        """Write sample credit cards with various last_updated dates."""
+        (data_dir / "credit_cards.json").write_bytes(orjson.dumps(SAMPLE_CARDS))
+        return SAMPLE_CARDS
+
+    @pytest.mark.parametrize(
+        ("kwargs", "expected_in", "expected_out"),
+        [
+            pytest.param(
+                {"query": "card", "recently_updated": 30},
+                {"Recently Updated Card"},
+                {"Month Old Card", "Old Card"},
+                id="30_days",
+            ),
+            pytest.param(
+                {"query": "card", "recently_updated": 90},
+                {"Recently Updated Card", "Month Old Card"},
+                {"Old Card"},
+                id="90_days",
+            ),
+            pytest.param(
+                {"query": "card", "recently_updated": 365},
+                set(),
+                {"Card Without Date"},
+                id="excludes_cards_without_date",
+            ),
+            pytest.param(
+                {"query": "card"},
+                {card["card_name"] for card in SAMPLE_CARDS},
+                set(),
+                id="none_returns_all",
+            ),
+            pytest.param(
+                {"query": "Chase", "recently_updated": 30},
+                {"Recently Updated Card"},
+                {"Month Old Card", "Old Card", "Very Old Card", "Card Without Date"},
+                id="with_other_filters",
+            ),
+        ],
+    )
+    def test_recently_updated(self, sample_cards_with_dates, kwargs, expected_in, expected_out):
+        """Should only return cards updated within the requested number of days."""
+        result = orjson.loads(credit_card_search.invoke(kwargs))
 
         assert "search_results" in result
-        card_names = [c["card_name"] for c in result["search_results"]]
-        assert "Recently Updated Card" in card_names
-        assert "Month Old Card" not in card_names
-        assert "Old Card" not in card_names
-
-    def test_recently_updated_90_days(self, sample_cards_with_dates):
-        """Should filter to cards updated in last 90 days."""
-        from tools import credit_card_search
-
-        result = json.loads(credit_card_search.invoke({"query": "card", "recently_updated": 90}))
-
-        assert "search_results" in result
-        card_names = [c["card_name"] for c in result["search_results"]]
-        assert "Recently Updated Card" in card_names
-        assert "Month Old Card" in card_names
-        assert "Old Card" not in card_names
-
-    def test_recently_updated_excludes_cards_without_date(self, sample_cards_with_dates):
-        """Should exclude cards without last_updated field when filtering."""
-        from tools import credit_card_search
-
-        result = json.loads(credit_card_search.invoke({"query": "card", "recently_updated": 365}))
-
-        card_names = [c["card_name"] for c in result["search_results"]]
-        assert "Card Without Date" not in card_names
-
-    def test_recently_updated_none_returns_all(self, sample_cards_with_dates):
-        """Should return all cards when recently_updated is None."""
-        from tools import credit_card_search
-
-        result = json.loads(credit_card_search.invoke({"query": "card"}))
-
-        assert "search_results" in result
-        # Without recently_updated filter, all matching cards should appear
-        assert result["total_results"] >= 4
+        card_names = {c["card_name"] for c in result["search_results"]}
+        assert expected_in <= card_names
+        assert not expected_out & card_names
 
     def test_recently_updated_invalid_returns_error(self, sample_cards_with_dates):
         """Should return error for invalid recently_updated value."""
-        from tools import credit_card_search
-
-        result = json.loads(credit_card_search.invoke({"query": "card", "recently_updated": -1}))
+        result = orjson.loads(credit_card_search.invoke({"query": "card", "recently_updated": -1}))
 
         assert "error" in result
 
-    def test_recently_updated_with_other_filters(self, sample_cards_with_dates):
-        """Should work with other search filters."""
-        from tools import credit_card_search
-
-        result = json.loads(credit_card_search.invoke({"query": "Chase", "recently_updated": 30}))
-
-        assert "search_results" in result
-        # Should only find Chase cards updated recently
-        for card in result["search_results"]:
-            assert "chase" in card["card_name"].lower() or "chase" in card.get("issuer", "").lower()
-
 
 class TestGetValuations:
     """Tests for get_valuations tool with programs filter."""
 
-    @pytest.fixture
-    def sample_valuations(self, tmp_path):
+    @pytest.fixture(scope="module")
+    def sample_valuations(self, data_dir):
         """Create sample valuations file."""
         content = {
             "version": "1.0",
@@ -153,14 +185,12 @@ class TestGetValuations:
                 },
             },
         }
-        (tmp_path / "valuations.json").write_text(json.dumps(content))
+        (data_dir / "valuations.json").write_bytes(orjson.dumps(content))
         return content
 
     def test_get_all_valuations(self, sample_valuations):
         """Should return all valuations when no filter specified."""
-        from tools import get_valuations
-
-        result = json.loads(get_valuations.invoke({}))
+        result = orjson.loads(get_valuations.invoke({}))
 
         assert "valuations" in result
         assert "unit" in result
@@ -169,9 +199,7 @@ class TestGetValuations:
 
     def test_filter_by_program_keys(self, sample_valuations):
         """Should filter to specific programs by key."""
-        from tools import get_valuations
-
-        result = json.loads(get_valuations.invoke({"programs": ["chase_ultimate_rewards", "united_mileageplus"]}))
+        result = orjson.loads(get_valuations.invoke({"programs": ["chase_ultimate_rewards", "united_mileageplus"]}))
 
         assert "valuations" in result
         assert len(result["valuations"]) == 2
@@ -181,9 +209,7 @@ class TestGetValuations:
 
     def test_filter_by_display_name(self, sample_valuations):
         """Should filter by display name (case-insensitive)."""
-        from tools import get_valuations
-
-        result = json.loads(get_valuations.invoke({"programs": ["Chase Ultimate Rewards"]}))
+        result = orjson.loads(get_valuations.invoke({"programs": ["Chase Ultimate Rewards"]}))
 
         assert "valuations" in result
         assert len(result["valuations"]) == 1
@@ -191,68 +217,328 @@ class TestGetValuations:
 
     def test_filter_normalized_names(self, sample_valuations):
         """Should normalize program names (spaces to underscores, case-insensitive)."""
-        from tools import get_valuations
-
-        result = json.loads(get_valuations.invoke({"programs": ["chase-ultimate-rewards"]}))
+        result = orjson.loads(get_valuations.invoke({"programs": ["chase-ultimate-rewards"]}))
 
         assert "valuations" in result
         assert "chase_ultimate_rewards" in result["valuations"]
 
     def test_filter_nonexistent_programs(self, sample_valuations):
         """Should return empty for nonexistent programs."""
-        from tools import get_valuations
-
-        result = json.loads(get_valuations.invoke({"programs": ["nonexistent_program"]}))
+        result = orjson.loads(get_valuations.invoke({"programs": ["nonexistent_program"]}))
 
         assert "valuations" in result
         assert len(result["valuations"]) == 0
 
     def test_filter_mixed_existing_and_nonexistent(self, sample_valuations):
         """Should return only existing programs from mixed list."""
-        from tools import get_valuations
-
-        result = json.loads(get_valuations.invoke({"programs": ["chase_ultimate_rewards", "nonexistent"]}))
+        result = orjson.loads(get_valuations.invoke({"programs": ["chase_ultimate_rewards", "nonexistent"]}))
 
         assert "valuations" in result
         assert len(result["valuations"]) == 1
         assert "chase_ultimate_rewards" in result["valuations"]
 
+    def test_filter_matches_mixed_case_custom_key(self, sample_valuations, tmp_data_dir):
+        """Should match custom valuations stored under keys with other casing or spacing."""
+        (tmp_data_dir / "valuations.json").write_bytes(orjson.dumps(sample_valuations))
+        user = {"wallet": {}, "custom_valuations": {"Bilt Rewards": 2.0}, "credits": {}}
+        (tmp_data_dir / "user.json").write_bytes(orjson.dumps(user))
+
+        result = orjson.loads(get_valuations.invoke({"programs": ["bilt_rewards", "Hilton Honors"]}))
+        assert result["valuations"] == {"Bilt Rewards": 2.0, "hilton_honors": 0.50}
+
     def test_invalid_programs_type(self, sample_valuations):
         """Should raise ValidationError for invalid programs type.
 
         Pydantic validates input before the function runs, so passing
         a string instead of a list raises a ValidationError.
         """
-        from pydantic import ValidationError
-
-        from tools import get_valuations
-
         with pytest.raises(ValidationError, match="Input should be a valid list"):
             get_valuations.invoke({"programs": "not_a_list"})
 
     def test_includes_timestamp(self, sample_valuations):
         """Should include last_updated_utc in response."""
-        from tools import get_valuations
-
-        result = json.loads(get_valuations.invoke({}))
+        result = orjson.loads(get_valuations.invoke({}))
 
         assert "last_updated_utc" in result
 
 
+class TestResultCache:
+    """Tests for caching read-only tool results."""
+
+    def test_reuses_result_until_data_changes(self, tmp_data_dir):
+        """Should serve repeated calls from the cache and recompute once a data file changes."""
+        file_path = tmp_data_dir / "valuations.json"
+        file_path.write_bytes(orjson.dumps({"valuations": {"hilton_honors": 0.5}}))
+
+        with (
+            mock.patch("data_storage.get_user_valuations", wraps=data_storage.get_user_valuations) as load,
+            mock.patch("tools._iso_now", return_value="2026-01-01T00:00:00+00:00"),
+        ):
+            first = get_valuations.invoke({"programs": ["hilton_honors"]})
+            assert get_valuations.invoke({"programs": ["hilton_honors"]}) == first
+            assert load.call_count == 1
+
+            file_path.write_bytes(orjson.dumps({"valuations": {"hilton_honors": 0.75}}))
+            result = orjson.loads(get_valuations.invoke({"programs": ["hilton_honors"]}))
+            assert result["valuations"] == {"hilton_honors": 0.75}
+            assert load.call_count == 2
+
+    def test_cached_result_gets_current_timestamp(self, tmp_data_dir):
+        """Should stamp a result served from the cache with the time it is served, not when it was computed."""
+        (tmp_data_dir / "valuations.json").write_bytes(orjson.dumps({"valuations": {"hilton_honors": 0.5}}))
+
+        with mock.patch("tools._iso_now", return_value="2026-01-01T00:00:00+00:00"):
+            first = orjson.loads(get_valuations.invoke({}))
+        with (
+            mock.patch("tools._iso_now", return_value="2026-01-01T00:04:00+00:00"),
+            mock.patch("data_storage.get_user_valuations") as load,
+        ):
+            second = orjson.loads(get_valuations.invoke({}))
+        load.assert_not_called()
+
+        assert first["last_updated_utc"] == "2026-01-01T00:00:00+00:00"
+        assert second == {**first, "last_updated_utc": "2026-01-01T00:04:00+00:00"}
+
+    def test_restamp_keeps_nested_timestamps(self, tmp_data_dir):
+        """Should only restamp the top-level timestamp, leaving a card's own last_updated_utc intact."""
+        card = {"card_name": "Uber Card", "issuer": "Amex", "last_updated_utc": "2025-06-01T00:00:00+00:00"}
+        card["benefits"] = {"credits": [{"type": "Uber Cash", "amount": 200}]}
+        (tmp_data_dir / "credit_cards.json").write_bytes(orjson.dumps([card]))
+
+        args = {"query": "uber", "verbose": True}
+        with mock.patch("tools._iso_now", return_value="2026-01-01T00:00:00+00:00"):
+            first = orjson.loads(tools.benefits_search.invoke(args))
+        with mock.patch("tools._iso_now", return_value="2026-01-01T00:04:00+00:00"):
+            second = orjson.loads(tools.benefits_search.invoke(args))
+
+        assert second["matches"][0]["last_updated_utc"] == "2025-06-01T00:00:00+00:00"
+        assert second == {**first, "last_updated_utc": "2026-01-01T00:04:00+00:00"}
+
+    def test_unhashable_arguments_skip_cache(self, tmp_data_dir):
+        """Should pass arguments that cannot be cached straight to the tool."""
+        (tmp_data_dir / "valuations.json").write_bytes(orjson.dumps({"valuations": {"hilton_honors": 0.5}}))
+
+        result = orjson.loads(get_valuations.func(programs={"hilton_honors": 1}))
+        assert result == {"error": "programs must be a list"}
+
+    def test_entries_expire(self):
+        """Should drop entries older than the TTL and evict the least recently used."""
+        cache = tools._ResultCache(maxsize=2, ttl=60)
+        cache.set(("a",), "1")
+        cache.set(("b",), "2")
+        assert cache.get(("a",)) == "1"
+        cache.set(("c",), "3")
+        assert cache.get(("b",)) is None
+        assert cache.get(("a",)) == "1"
+
+        with mock.patch("tools.time.monotonic", return_value=time.monotonic() + 61):
+            assert cache.get(("a",)) is None
+
+
+class TestSlimResponses:
+    """Tests for the default slim output of benefits_search and get_top_card_offers."""
+
+    @pytest.fixture
+    def benefit_cards(self, tmp_data_dir):
+        """Write two cards, one with credits, lounges and status."""
+        cards = [
+            {
+                "card_name": "Lounge Card",
+                "issuer": "Amex",
+                "annual_fee": 695,
+                "card_type": "Personal",
+                "first_year_value_estimate": 900,
+                "fm_mini_review": "Premium travel card",
+                "benefits": {
+                    "credits": [{"type": "Uber Cash", "amount": 200}],
+                    "lounge": [{"type": "Centurion Lounge"}],
+                    "status": {"hotel_elite_status": [{"program": "Hilton Honors", "tier": "Gold"}]},
+                },
+            },
+            {"card_name": "Plain Card", "issuer": "Citi", "card_type": "Business", "first_year_value_estimate": 100},
+        ]
+        (tmp_data_dir / "credit_cards.json").write_bytes(orjson.dumps(cards))
+        return cards
+
+    def test_benefits_search_returns_matched_benefit(self, benefit_cards):
+        """Should return card summaries with the matching benefit entry, and full benefits when verbose."""
+        result = orjson.loads(tools.benefits_search.invoke({"query": "uber"}))
+        assert result["matches"] == [
+            {
+                "card_name": "Lounge Card",
+                "issuer": "Amex",
+                "annual_fee": 695,
+                "rewards_currency": None,
+                "card_type": "Personal",
+                "matched_benefit": {"credits": {"type": "Uber Cash", "amount": 200}},
+            }
+        ]
+
+        status = orjson.loads(tools.benefits_search.invoke({"query": "hotel status"}))
+        assert status["matches"][0]["matched_benefit"] == {
+            "hotel_elite_status": [{"program": "Hilton Honors", "tier": "Gold"}]
+        }
+
+        verbose = orjson.loads(tools.benefits_search.invoke({"query": "uber", "verbose": True}))
+        assert verbose["matches"][0]["benefits"] == benefit_cards[0]["benefits"]
+
+    def test_top_offers_use_benefit_tags(self, benefit_cards):
+        """Should replace full benefits with key benefit tags unless verbose."""
+        offers = orjson.loads(tools.get_top_card_offers.invoke({"n": 2}))["offers"]
+        assert offers[0]["key_benefit_tags"] == ["Uber Cash", "Centurion Lounge", "Hilton Honors Gold"]
+        assert offers[1]["key_benefit_tags"] == []
+        assert "benefits" not in offers[0]
+
+        verbose = orjson.loads(tools.get_top_card_offers.invoke({"n": 2, "verbose": True}))["offers"]
+        assert verbose[0]["benefits"] == benefit_cards[0]["benefits"]
+        assert "key_benefit_tags" not in verbose[0]
+
+
+class TestGetUserData:
+    """Tests for the get_user_data tool."""
+
+    def test_matches_full_encoding_and_refreshes_on_save(self, tmp_data_dir):
+        """Spliced fragments should equal encoding the whole result, and change after a wallet update."""
+        cards = [{"card_name": "Gold Card", "issuer": "Amex"}, {"card_name": "Blue Card", "issuer": "Amex"}]
+        (tmp_data_dir / "credit_cards.json").write_bytes(orjson.dumps(cards))
+        (tmp_data_dir / "valuations.json").write_bytes(orjson.dumps({"valuations": {"hilton_honors": 0.5}}))
+
+        assert data_storage.add_card_to_wallet("Gold Card", note="Dining")
+        user = data_storage.get_user_data()
+        expected = {
+            "wallet": [{**cards[0], "user_note": "Dining"}],
+            "valuations": {
+                "last_updated_utc": user["last_updated"],
+                "unit": "cents_per_point",
+                "valuations": {"hilton_honors": 0.5},
+            },
+            "credits": {"last_updated_utc": user["last_updated"], "credits": {}},
+        }
+        assert tools.get_user_data.invoke({}) == orjson.dumps(expected).decode()
+
+        assert data_storage.add_card_to_wallet("Blue Card")
+        result = orjson.loads(tools.get_user_data.invoke({}))
+        assert [card["card_name"] for card in result["wallet"]] == ["Gold Card", "Blue Card"]
+
+
+class TestIsoNow:
+    """Tests for the cached UTC timestamp."""
+
+    def test_formats_once_per_second(self):
+        """Should reuse the formatted string within a second and refresh on the next one."""
+        with mock.patch("tools.time.time", return_value=1_700_000_000.25):
+            first = tools._iso_now()
+            assert first == "2023-11-14T22:13:20+00:00"
+            assert tools._iso_now() is first
+
+        with mock.patch("tools.time.time", return_value=1_700_000_001.0):
+            assert tools._iso_now() == "2023-11-14T22:13:21+00:00"
+
+
+class TestRagRefresh:
+    """Tests for background RAG index updates."""
+
+    def test_runs_one_update_at_a_time(self):
+        """Should not start a second update while one is running, and allow one after it finishes."""
+        started = threading.Event()
+        release = threading.Event()
+
+        def crawl():
+            started.set()
+            release.wait(5)
+
+        fresh_index = mock.Mock()
+        fresh_index.crawl_and_index.side_effect = crawl
+        build_index = mock.Mock(return_value=fresh_index)
+
+        with mock.patch("tools._create_doc_search_tool"), mock.patch("tools._doc_index", None):
+            assert tools._start_rag_refresh(build_index)
+            assert started.wait(5)
+            assert not tools._start_rag_refresh(build_index)
+
+            release.set()
+            deadline = time.monotonic() + 5
+            while tools._rag_refresh_running.is_set() and time.monotonic() < deadline:
+                time.sleep(0.01)
+        assert not tools._rag_refresh_running.is_set()
+        assert fresh_index.crawl_and_index.call_count == 1
+
+    def test_refresh_swaps_in_new_index_when_built(self):
+        """Should keep serving the loaded index during the build, then swap the index and search function."""
+        live_index = mock.Mock()
+        fresh_index = mock.Mock()
+        doc_search = SimpleNamespace(name="doc_search", func=mock.Mock(name="old_search"))
+        new_search = mock.Mock(name="new_search")
+
+        def crawl():
+            assert tools._doc_index is live_index
+            assert doc_search.func is not new_search
+
+        fresh_index.crawl_and_index.side_effect = crawl
+        with (
+            mock.patch("tools._doc_index", live_index),
+            mock.patch("tools._doc_search_tool", doc_search),
+            mock.patch("tools._create_doc_search_tool", return_value=SimpleNamespace(func=new_search)) as create,
+        ):
+            tools._refresh_rag_index(lambda: fresh_index)
+            assert tools._doc_index is fresh_index
+        create.assert_called_once_with(fresh_index)
+        assert doc_search.func is new_search
+        live_index.crawl_and_index.assert_not_called()
+
+    def test_initialize_runs_once_per_process(self, capsys):
+        """Initializing again in the process that already built the index should do nothing."""
+        with (
+            mock.patch.object(tools.config, "RAG_ENABLED", True),
+            mock.patch("tools._rag_init_pid", os.getpid()),
+            mock.patch("tools._doc_index", None),
+        ):
+            tools.initialize_rag_at_startup()
+            assert tools._doc_index is None
+        assert capsys.readouterr().out == ""
+
+    def test_warm_up_ignores_search_errors(self):
+        """A failing warm-up search should not raise."""
+        doc_index = mock.Mock()
+        doc_index.search.side_effect = RuntimeError("model not loaded")
+        tools._warm_rag_index(doc_index)
+        doc_index.search.assert_called_once()
+
+
 class TestToolsExported:
     """Tests for tool exports."""
 
     def test_get_valuations_in_miles_tools(self, tmp_path):
         """get_valuations should be exported in MILES_TOOLS."""
-        from tools import MILES_TOOLS
-
-        tool_names = [t.name for t in MILES_TOOLS]
-        assert "get_valuations" in tool_names
+        assert "get_valuations" in _TOOL_NAMES
 
     def test_credit_card_search_has_recently_updated(self, tmp_path):
         """credit_card_search should have recently_updated parameter."""
-        from tools import credit_card_search
-
         # Check the tool's schema includes recently_updated
-        schema = credit_card_search.args_schema.model_json_schema()
+        schema = _schema(credit_card_search.args_schema)
         assert "recently_updated" in schema.get("properties", {})
+
+    def test_get_all_tools_rebuilt_when_doc_search_added(self):
+        """get_all_tools should reuse its result until the doc_search tool appears."""
+        with mock.patch("tools._doc_search_tool", None), mock.patch("tools._all_tools_cache", None):
+            base = tools.get_all_tools()
+            assert tools.get_all_tools() is base
+            assert "get_valuations" in {t.name for t in base}
+
+            doc_search = SimpleNamespace(name="doc_search")
+            with mock.patch("tools._doc_search_tool", doc_search):
+                with_docs = tools.get_all_tools()
+            assert with_docs[-1] is doc_search
+            assert list(with_docs[:-1]) == list(base)
+
+    def test_web_search_created_on_first_access(self):
+        """web_search and ALL_TOOLS should create the web search tool once, when first used."""
+        web_search = SimpleNamespace(name="web_search")
+        with (
+            mock.patch("tools._static_tools", None),
+            mock.patch("tools.create_web_search_tool", return_value=web_search) as create,
+        ):
+            assert create.call_count == 0
+            assert tools.web_search is web_search
+            assert tools.ALL_TOOLS[-1] is web_search
+            assert create.call_count == 1
@@ -1,14 +1,152 @@
 """Tool definitions for Miles using LangChain framework."""
 
-import json
+import functools
+import itertools
+import logging
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Callable, Iterator
 from datetime import UTC, datetime, timedelta
+from typing import Any, TextIO
 
+import orjson
 from langchain_core.tools import tool
 from llm_tools_server import BUILTIN_TOOLS, create_web_search_tool
 
 import data_storage
 from config import config
 
+logger = logging.getLogger(__name__)
+
+# Allowed values of the tools' enumerated arguments
+_VALID_DIRECTIONS = frozenset(("from", "to"))
+_VALID_CARD_TYPES = frozenset(("business", "personal", "all"))
+
+# Path traversal and control characters rejected in card names
+_BAD_CHARS_RE = re.compile(r"\.\./|\.\.\\|\x00|\n|\r")
+
+# benefits_search query words that select an elite status category, and words that only mark a status query
+_STATUS_CATEGORY_KEYWORDS = {
+    "hotel": "hotel_elite_status",
+    "airline": "airline_elite_status",
+    "rental": "rental_car_elite_status",
+    "car": "rental_car_elite_status",
+}
+_STATUS_WORDS = frozenset(("elite", "status"))
+
+# Match reasons listed per credit_card_search result
+MAX_MATCH_REASONS = 3
+
+# Results of read-only tools are reused for repeated calls with the same arguments
+# until the data files change or the entry expires
+RESULT_CACHE_SIZE = 512
+RESULT_CACHE_TTL_SECONDS = 300
+
+
+class _ResultCache:
+    """Thread-safe LRU cache whose entries also expire after a fixed time."""
+
+    def __init__(self, maxsize: int, ttl: float) -> None:
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries: OrderedDict[tuple, tuple[float, str | dict]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: tuple) -> str | dict | None:
+        """Return the cached value for key, or None if missing or expired."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry[0] < time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return entry[1]
+
+    def set(self, key: tuple, value: str | dict) -> None:
+        """Store a value, evicting the least recently used entry when full."""
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+            self._entries.move_to_end(key)
+            if len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        """Remove all entries."""
+        with self._lock:
+            self._entries.clear()
+
+
+_result_cache = _ResultCache(RESULT_CACHE_SIZE, RESULT_CACHE_TTL_SECONDS)
+
+
+def _cache_key_value(value: object) -> object:
+    """Make a tool argument hashable for use in a cache key."""
+    return tuple(value) if isinstance(value, list) else value
+
+
+def _cacheable(result: str) -> str | dict:
+    """Return the parsed result if it has a top-level last_updated_utc to restamp, else the result itself."""
+    try:
+        data = orjson.loads(result)
+    except orjson.JSONDecodeError:
+        return result
+    return data if isinstance(data, dict) and "last_updated_utc" in data else result
+
+
+def _cached_result(func: Callable[..., str]) -> Callable[..., str]:
+    """Cache a read-only tool's JSON output per arguments and data version."""
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs) -> str:
+        try:
+            key = (
+                func.__name__,
+                tuple(_cache_key_value(a) for a in args),
+                tuple(sorted((k, _cache_key_value(v)) for k, v in kwargs.items())),
+                data_storage.data_version(),
+            )
+            cached = _result_cache.get(key)
+        except TypeError:
+            # Unhashable arguments; let the tool validate them without caching
+            return func(*args, **kwargs)
+        if cached is None:
+            result = func(*args, **kwargs)
+            _result_cache.set(key, _cacheable(result))
+            return result
+        if isinstance(cached, str):
+            return cached
+        # Only the top-level timestamp is refreshed; nested ones (e.g. a card's) are part of the data
+        return _dumps({**cached, "last_updated_utc": _iso_now()})
+
+    return wrapper
+
+
+# (epoch second, ISO 8601 string) of the most recent _iso_now call
+_iso_now_cache: dict[str, tuple[int, str]] = {"entry": (0, "")}
+
+
+def _iso_now() -> str:
+    """Current UTC time as an ISO 8601 string at second resolution, formatted at most once per second."""
+    second = int(time.time())
+    cached_second, iso = _iso_now_cache["entry"]
+    if cached_second != second:
+        iso = datetime.fromtimestamp(second, UTC).isoformat()
+        _iso_now_cache["entry"] = (second, iso)
+    return iso
+
+
+def _dumps(obj: object) -> str:
+    """Serialize a tool result to a JSON string, indented only when TOOL_OUTPUT_PRETTY is set."""
+    option = orjson.OPT_NON_STR_KEYS
+    if config.TOOL_OUTPUT_PRETTY:
+        option |= orjson.OPT_INDENT_2
+    return orjson.dumps(obj, option=option).decode()
+
 
 @tool
 def get_user_data() -> str:
@@ -23,6 +161,16 @@ def get_user_data() -> str:
         JSON string containing wallet, valuations, and credits
     """
     try:
+        if not config.TOOL_OUTPUT_PRETTY:
+            # Splice the wallet, valuations and credits JSON, encoded once per data version
+            wallet_json, valuations_json, credits_json = data_storage.get_user_json_fragments()
+            last_updated = orjson.dumps(data_storage.get_user_data().get("last_updated"))
+            return (
+                b'{"wallet":%b,"valuations":{"last_updated_utc":%b,"unit":"cents_per_point","valuations":%b},'
+                b'"credits":{"last_updated_utc":%b,"credits":%b}}'
+                % (wallet_json, last_updated, valuations_json, last_updated, credits_json)
+            ).decode()
+
         wallet = data_storage.get_user_wallet()
         valuations = data_storage.get_user_valuations()
         credits = data_storage.get_user_credits()
@@ -38,13 +186,14 @@ def get_user_data() -> str:
             "credits": {"last_updated_utc": user_data.get("last_updated"), "credits": credits},
         }
 
-        return json.dumps(result, indent=2)
+        return _dumps(result)
 
     except Exception as e:
-        return json.dumps({"error": str(e)})
+        return _dumps({"error": str(e)})
 
 
 @tool
+@_cached_result
 def get_valuations(programs: list[str] | None = None) -> str:
     """Get point and mile valuations in cents per point.
 
@@ -60,45 +209,39 @@ def get_valuations(programs: list[str] | None = None) -> str:
     """
     try:
         valuations = data_storage.get_user_valuations()
-        valuations_metadata = data_storage.get_valuations_with_metadata()
 
         # Filter by programs if specified
         if programs:
             if not isinstance(programs, list):
-                return json.dumps({"error": "programs must be a list"})
-
-            # Normalize program names for matching
-            def normalize_key(s):
-                return s.lower().replace(" ", "_").replace("-", "_")
-
-            # Build lookup from normalized key to actual key
-            normalized_lookup = {}
-            for key in valuations:
-                normalized_lookup[normalize_key(key)] = key
-                # Also add display name mapping if available
-                val_data = valuations_metadata.get("valuations", {}).get(key, {})
-                if isinstance(val_data, dict) and val_data.get("display_name"):
-                    normalized_lookup[normalize_key(val_data["display_name"])] = key
-
+                return _dumps({"error": "programs must be a list"})
+
+            # Match program keys and display names after normalization. Custom keys in
+            # user.json may be stored with any casing or spacing, so normalize them too.
+            key_index = data_storage.get_valuation_key_index()
+            custom_valuations = data_storage.get_user_data().get("custom_valuations", {})
+            if custom_valuations:
+                key_index = {
+                    **key_index,
+                    **{data_storage.normalize_program_key(key): key for key in custom_valuations},
+                }
             filtered_valuations = {}
             for program in programs:
-                normalized = normalize_key(program)
-                if normalized in normalized_lookup:
-                    actual_key = normalized_lookup[normalized]
+                actual_key = key_index.get(data_storage.normalize_program_key(program))
+                if actual_key in valuations:
                     filtered_valuations[actual_key] = valuations[actual_key]
 
             valuations = filtered_valuations
 
         result = {
-            "last_updated_utc": datetime.now(UTC).isoformat(),
+            "last_updated_utc": _iso_now(),
             "unit": "cents_per_point",
             "valuations": valuations,
         }
 
-        return json.dumps(result, indent=2)
+        return _dumps(result)
 
     except Exception as e:
-        return json.dumps({"error": str(e)})
+        return _dumps({"error": str(e)})
 
 
 @tool
@@ -117,27 +260,48 @@ def get_credit_card_info(card_name: str) -> str:
     try:
         # Input validation
         if not card_name or not isinstance(card_name, str):
-            return json.dumps({"error": "Invalid card name: must be a non-empty string"})
+            return _dumps({"error": "Invalid card name: must be a non-empty string"})
 
         # Validate length
         if len(card_name) > 200:
-            return json.dumps({"error": "Card name too long (max 200 characters)"})
+            return _dumps({"error": "Card name too long (max 200 characters)"})
 
         # Prevent path traversal and other injection attempts
-        if any(char in card_name for char in ["../", "..\\", "\0", "\n", "\r"]):
-            return json.dumps({"error": "Invalid characters in card name"})
+        if _BAD_CHARS_RE.search(card_name):
+            return _dumps({"error": "Invalid characters in card name"})
 
         card = data_storage.get_credit_card_by_name(card_name)
 
         if not card:
-            return json.dumps(
+            return _dumps(
                 {"error": f"Card not found: {card_name}", "suggestion": "Please check the card name and try again"}
             )
 
-        return json.dumps(card, indent=2)
+        return _dumps(card)
 
     except Exception as e:
-        return json.dumps({"error": str(e)})
+        return _dumps({"error": str(e)})
+
+
+def _match_reasons(columns: dict[str, list], i: int, query_lower: str) -> Iterator[str]:
+    """Describe each credit_card_search field of card i that contains the query, in scoring order."""
+    if query_lower in columns["card_name"][i]:
+        yield "Card name match"
+    if query_lower in columns["issuer"][i]:
+        yield "Issuer match"
+    if query_lower in columns["rewards_currency"][i]:
+        yield "Rewards currency match"
+    for category_lower, category in columns["categories"][i]:
+        if query_lower in category_lower:
+            yield f"Category: {category}"
+    for credit_lower, credit in columns["credits"][i]:
+        if query_lower in credit_lower:
+            yield f"Credit: {credit}"
+    for lounge_lower, lounge in columns["lounges"][i]:
+        if query_lower in lounge_lower:
+            yield f"Lounge: {lounge}"
+    if query_lower in columns["card_type"][i]:
+        yield "Card type match"
 
 
 @tool
@@ -158,117 +322,109 @@ def credit_card_search(query: str, max_results: int = 5, recently_updated: int |
     try:
         # Input validation
         if not query or not isinstance(query, str):
-            return json.dumps({"error": "Invalid query: must be a non-empty string"})
+            return _dumps({"error": "Invalid query: must be a non-empty string"})
 
         # Validate query length
         if len(query) > 500:
-            return json.dumps({"error": "Query too long (max 500 characters)"})
+            return _dumps({"error": "Query too long (max 500 characters)"})
 
         # Validate max_results is reasonable
         if not isinstance(max_results, int) or max_results < 1:
-            return json.dumps({"error": "max_results must be a positive integer"})
+            return _dumps({"error": "max_results must be a positive integer"})
 
         if max_results > 50:
             max_results = 50  # Cap at 50 to prevent resource exhaustion
-        cards = data_storage.get_credit_cards()
+        search_index = data_storage.get_card_search_index()
+        cards = search_index["cards"]
+        query_lower = query.lower()
+
+        # Only cards containing every trigram of the query can match it
+        card_ids = data_storage.trigram_candidates(search_index["search_trigrams"], query_lower)
+        if card_ids is None:
+            card_ids = range(len(cards))
 
         # Filter by recently_updated if specified
         if recently_updated is not None:
             if not isinstance(recently_updated, int) or recently_updated < 1:
-                return json.dumps({"error": "recently_updated must be a positive integer"})
+                return _dumps({"error": "recently_updated must be a positive integer"})
 
+            # Dates are parsed once per data file version; cards without a valid date are excluded
             cutoff_date = datetime.now() - timedelta(days=recently_updated)
-            filtered_cards = []
-            for card in cards:
-                last_updated = card.get("last_updated")
-                if last_updated:
-                    try:
-                        # Parse MM/DD/YY format
-                        card_date = datetime.strptime(last_updated, "%m/%d/%y")
-                        if card_date >= cutoff_date:
-                            filtered_cards.append(card)
-                    except ValueError:
-                        # Skip cards with invalid date format
-                        pass
-            cards = filtered_cards
-        query_lower = query.lower()
-        matches = []
+            updated = search_index["last_updated"]
+            filtered_ids = [i for i in card_ids if updated[i] is not None and updated[i] >= cutoff_date]
+            card_ids = filtered_ids
+
+        # Fields are lowercased once per data file version, one list per field
+        columns = search_index["search_columns"]
+        names = columns["card_name"]
+        issuers = columns["issuer"]
+        currencies = columns["rewards_currency"]
+        card_types = columns["card_type"]
+        search_blobs = search_index["search_blobs"]
+
+        scored = []
+        for i in card_ids:
+            # One substring check over all searched fields rejects most cards before scoring
+            if query_lower not in search_blobs[i]:
+                continue
 
-        for card in cards:
             score = 0
-            match_reasons = []
 
             # Search in card name
-            if query_lower in card.get("card_name", "").lower():
+            if query_lower in names[i]:
                 score += 10
-                match_reasons.append("Card name match")
 
             # Search in issuer
-            if query_lower in card.get("issuer", "").lower():
+            if query_lower in issuers[i]:
                 score += 5
-                match_reasons.append("Issuer match")
 
             # Search in rewards currency
-            if query_lower in card.get("rewards_currency", "").lower():
+            if query_lower in currencies[i]:
                 score += 3
-                match_reasons.append("Rewards currency match")
-
-            # Search in reward categories
-            for multiplier in card.get("reward_multipliers", []):
-                category = multiplier.get("category", "").lower()
-                if query_lower in category:
-                    score += 2
-                    match_reasons.append(f"Category: {multiplier.get('category')}")
-
-            # Search in benefits
-            benefits = card.get("benefits", {})
 
-            # Check credits
-            for credit in benefits.get("credits", []):
-                if query_lower in credit.get("type", "").lower():
-                    score += 2
-                    match_reasons.append(f"Credit: {credit.get('type')}")
-
-            # Check lounge access
-            for lounge in benefits.get("lounge", []):
-                if query_lower in lounge.get("type", "").lower():
-                    score += 2
-                    match_reasons.append(f"Lounge: {lounge.get('type')}")
+            # Search in reward categories, credits and lounge access
+            for field in ("categories", "credits", "lounges"):
+                for lower, _ in columns[field][i]:
+                    if query_lower in lower:
+                        score += 2
 
             # Check card type (personal/business)
-            if query_lower in card.get("card_type", "").lower():
+            if query_lower in card_types[i]:
                 score += 3
-                match_reasons.append("Card type match")
 
             # Add to matches if score > 0
             if score > 0:
-                matches.append(
-                    {
-                        "card_name": card.get("card_name"),
-                        "issuer": card.get("issuer"),
-                        "rewards_currency": card.get("rewards_currency"),
-                        "annual_fee": card.get("annual_fee"),
-                        "card_type": card.get("card_type"),
-                        "score": score,
-                        "match_reasons": match_reasons[:3],  # Top 3 reasons
-                    }
-                )
+                scored.append((i, score))
 
         # Sort by score descending
-        matches.sort(key=lambda x: x["score"], reverse=True)
+        scored.sort(key=lambda x: x[1], reverse=True)
 
-        # Limit results
-        matches = matches[:max_results]
+        # Limit results, then describe only the returned cards' matches
+        matches = []
+        for i, score in scored[:max_results]:
+            card = cards[i]
+            matches.append(
+                {
+                    "card_name": card.get("card_name"),
+                    "issuer": card.get("issuer"),
+                    "rewards_currency": card.get("rewards_currency"),
+                    "annual_fee": card.get("annual_fee"),
+                    "card_type": card.get("card_type"),
+                    "score": score,
+                    "match_reasons": list(itertools.islice(_match_reasons(columns, i, query_lower), MAX_MATCH_REASONS)),
+                }
+            )
 
         result = {"search_results": matches, "total_results": len(matches), "query": query}
 
-        return json.dumps(result, indent=2)
+        return _dumps(result)
 
     except Exception as e:
-        return json.dumps({"error": str(e)})
+        return _dumps({"error": str(e)})
 
 
 @tool
+@_cached_result
 def lookup_transfer_partners(program_name: str, direction: str = "from") -> str:
     """Look up transfer partners for a loyalty program.
 
@@ -284,134 +440,138 @@ def lookup_transfer_partners(program_name: str, direction: str = "from") -> str:
     try:
         # Input validation
         if not program_name or not isinstance(program_name, str):
-            return json.dumps({"error": "Invalid program name: must be a non-empty string"})
+            return _dumps({"error": "Invalid program name: must be a non-empty string"})
 
         if len(program_name) > 200:
-            return json.dumps({"error": "Program name too long (max 200 characters)"})
+            return _dumps({"error": "Program name too long (max 200 characters)"})
 
         # Validate direction is one of the allowed values
-        if direction not in ["from", "to"]:
-            return json.dumps({"error": "Invalid direction: must be 'from' or 'to'"})
+        if direction not in _VALID_DIRECTIONS:
+            return _dumps({"error": "Invalid direction: must be 'from' or 'to'"})
 
-        transfer_data = data_storage.get_transfer_partners()
-        valuations = data_storage.get_user_valuations()
+        # Program and partner names are lowercased and joined once per data file version
+        names = data_storage.get_transfer_name_index()
+        transfer_data = names["data"]
+        valuation_keys = data_storage.get_transfer_valuation_keys()
+        valuations = data_storage.get_user_valuations_view()
 
         program_name_lower = program_name.lower()
 
         if direction == "from":
             # Find where you can transfer FROM this program
-            for prog_key, partners in transfer_data.items():
-                if program_name_lower in prog_key.lower():
-                    # Found the source program
-                    result_partners = []
-
-                    for partner in partners:
-                        loyalty_program = partner.get("Loyalty Program", "")
-                        ratio = partner.get("Ratio", 1.0)
-                        best = partner.get("Best", False)
-                        notes = partner.get("Notes", "")
-                        bonus = partner.get("Bonus", "")
-
-                        # Look up valuation for destination
-                        dest_key = loyalty_program.lower().replace(" ", "_").replace("-", "_")
-                        valuation = valuations.get(dest_key, 1.0)
-
-                        partner_info = {
-                            "loyalty_program": loyalty_program,
-                            "best": best,
-                            "ratio": ratio,
-                            "notes": notes,
-                            "valuation": valuation,
-                            "summary": f"{ratio}:1, {valuation} cents per point",
-                        }
-
-                        if bonus:
-                            partner_info["bonus"] = bonus
-                            # Add bonus_expiration if present
-                            bonus_exp = partner.get("bonus_expiration")
-                            if bonus_exp:
-                                partner_info["bonus_expiration"] = bonus_exp
-
-                        result_partners.append(partner_info)
-
-                    # Sort by valuation descending
-                    result_partners.sort(key=lambda x: x["valuation"], reverse=True)
-
-                    result = {
-                        "type": "from_program",
-                        "source_program": prog_key,
-                        "last_updated_utc": datetime.now(UTC).isoformat(),
-                        "dest_programs": result_partners,
+            matched = data_storage.match_joined_names(
+                names["program_blob"], names["program_starts"], program_name_lower
+            )
+            if matched:
+                # Found the source program
+                prog_key = names["program_keys"][matched[0]]
+                result_partners = []
+
+                for partner, dest_key in zip(transfer_data[prog_key], valuation_keys[prog_key][1]):
+                    loyalty_program = partner.get("Loyalty Program", "")
+                    ratio = partner.get("Ratio", 1.0)
+                    best = partner.get("Best", False)
+                    notes = partner.get("Notes", "")
+                    bonus = partner.get("Bonus", "")
+
+                    # Look up valuation for destination
+                    valuation = valuations.get(dest_key, 1.0)
+
+                    partner_info = {
+                        "loyalty_program": loyalty_program,
+                        "best": best,
+                        "ratio": ratio,
+                        "notes": notes,
+                        "valuation": valuation,
+                        "summary": f"{ratio}:1, {valuation} cents per point",
                     }
 
-                    return json.dumps(result, indent=2)
+                    if bonus:
+                        partner_info["bonus"] = bonus
+                        # Add bonus_expiration if present
+                        bonus_exp = partner.get("bonus_expiration")
+                        if bonus_exp:
+                            partner_info["bonus_expiration"] = bonus_exp
+
+                    result_partners.append(partner_info)
+
+                # Sort by valuation descending
+                result_partners.sort(key=lambda x: x["valuation"], reverse=True)
+
+                result = {
+                    "type": "from_program",
+                    "source_program": prog_key,
+                    "last_updated_utc": _iso_now(),
+                    "dest_programs": result_partners,
+                }
+
+                return _dumps(result)
 
         else:  # direction == "to"
             # Find what can transfer TO this program
             source_programs = []
+            matched = data_storage.match_joined_names(
+                names["partner_blob"], names["partner_starts"], program_name_lower
+            )
 
-            for prog_key, partners in transfer_data.items():
-                for partner in partners:
-                    loyalty_program = partner.get("Loyalty Program", "")
+            for prog_key, partner in [names["partner_refs"][idx] for idx in matched]:
+                # This program can receive transfers from prog_key
+                ratio = partner.get("Ratio", 1.0)
+                best = partner.get("Best", False)
+                notes = partner.get("Notes", "")
+                bonus = partner.get("Bonus", "")
+
+                # Look up valuation for source
+                source_val = valuations.get(valuation_keys[prog_key][0], 1.0)
+
+                source_info = {
+                    "loyalty_program": prog_key,
+                    "ratio": ratio,
+                    "best": best,
+                    "notes": notes,
+                    "summary": f"{ratio}:1, {source_val} cents per point",
+                }
+
+                if bonus:
+                    source_info["bonus"] = bonus
+                    # Add bonus_expiration if present
+                    bonus_exp = partner.get("bonus_expiration")
+                    if bonus_exp:
+                        source_info["bonus_expiration"] = bonus_exp
 
-                    if program_name_lower in loyalty_program.lower():
-                        # This program can receive transfers from prog_key
-                        ratio = partner.get("Ratio", 1.0)
-                        best = partner.get("Best", False)
-                        notes = partner.get("Notes", "")
-                        bonus = partner.get("Bonus", "")
-
-                        # Look up valuation for source
-                        source_key = prog_key.lower().replace(" ", "_").replace("-", "_")
-                        source_val = valuations.get(source_key, 1.0)
-
-                        source_info = {
-                            "loyalty_program": prog_key,
-                            "ratio": ratio,
-                            "best": best,
-                            "notes": notes,
-                            "summary": f"{ratio}:1, {source_val} cents per point",
-                        }
-
-                        if bonus:
-                            source_info["bonus"] = bonus
-                            # Add bonus_expiration if present
-                            bonus_exp = partner.get("bonus_expiration")
-                            if bonus_exp:
-                                source_info["bonus_expiration"] = bonus_exp
-
-                        source_programs.append(source_info)
+                source_programs.append(source_info)
 
             if source_programs:
                 # Get valuation for destination program
-                dest_key = program_name.lower().replace(" ", "_").replace("-", "_")
+                dest_key = data_storage.normalize_program_key(program_name)
                 dest_valuation = valuations.get(dest_key, 1.0)
 
                 result = {
                     "type": "to_program",
                     "dest_program": program_name,
                     "valuation": dest_valuation,
-                    "last_updated_utc": datetime.now(UTC).isoformat(),
+                    "last_updated_utc": _iso_now(),
                     "source_programs": source_programs,
                 }
 
-                return json.dumps(result, indent=2)
+                return _dumps(result)
 
         # No results found
-        return json.dumps(
+        return _dumps(
             {
                 "type": "none",
-                "last_updated_utc": datetime.now(UTC).isoformat(),
+                "last_updated_utc": _iso_now(),
                 "results": [],
                 "message": f"No transfer partners found for '{program_name}'",
             }
         )
 
     except Exception as e:
-        return json.dumps({"error": str(e)})
+        return _dumps({"error": str(e)})
 
 
 @tool
+@_cached_result
 def get_transfer_bonuses(from_program: str = "") -> str:
     """Get all currently active transfer bonuses across all programs.
 
@@ -430,86 +590,53 @@ def get_transfer_bonuses(from_program: str = "") -> str:
     try:
         # Input validation
         if from_program and not isinstance(from_program, str):
-            return json.dumps({"error": "Invalid from_program: must be a string"})
+            return _dumps({"error": "Invalid from_program: must be a string"})
 
         if from_program and len(from_program) > 200:
-            return json.dumps({"error": "Program name too long (max 200 characters)"})
-
-        transfer_data = data_storage.get_transfer_partners()
-
-        from_program_lower = from_program.lower() if from_program else ""
-        bonuses = []
-
-        for source_program, partners in transfer_data.items():
-            # Filter by source program if specified
-            if from_program_lower and from_program_lower not in source_program.lower():
-                continue
-
-            for partner in partners:
-                bonus = partner.get("Bonus")
-
-                # Skip if no bonus or bonus is not a valid multiplier
-                if bonus is None or bonus == "None" or bonus == "Varies":
-                    continue
-
-                # Ensure bonus is a number
-                if not isinstance(bonus, (int, float)):
-                    continue
-
-                # Skip if bonus is 1.0 or less (no actual bonus)
-                if bonus <= 1.0:
-                    continue
-
-                loyalty_program = partner.get("Loyalty Program", "")
-                ratio = partner.get("Ratio", 1.0)
-                notes = partner.get("Notes", "")
-
-                # Calculate bonus percentage
-                bonus_pct = (bonus - 1.0) * 100
-
-                bonus_info = {
-                    "from_program": source_program,
-                    "to_program": loyalty_program,
-                    "bonus_multiplier": bonus,
-                    "bonus_percentage": f"{bonus_pct:.0f}%",
-                    "normal_ratio": f"{ratio}:1",
-                    "effective_ratio": f"{ratio}:{bonus * ratio}",
-                    "notes": notes,
-                }
-
-                # Add bonus_expiration if present
-                bonus_exp = partner.get("bonus_expiration")
-                if bonus_exp:
-                    bonus_info["bonus_expiration"] = bonus_exp
+            return _dumps({"error": "Program name too long (max 200 characters)"})
 
-                bonuses.append(bonus_info)
+        # Bonus rows are built and sorted by bonus multiplier once per data file version
+        precomputed = data_storage.get_precomputed_transfer_bonuses()
+        bonuses = precomputed["rows"]
 
-        # Sort by bonus percentage descending
-        bonuses.sort(key=lambda x: x["bonus_multiplier"], reverse=True)
+        # Filter by source program if specified
+        if from_program:
+            names = data_storage.get_transfer_name_index()
+            matched = set(
+                data_storage.match_joined_names(names["program_blob"], names["program_starts"], from_program.lower())
+            )
+            bonuses = (
+                [row for row, prog_idx in zip(bonuses, precomputed["program_indices"]) if prog_idx in matched]
+                if matched
+                else []
+            )
 
         result = {
             "bonuses": bonuses,
             "count": len(bonuses),
-            "last_updated_utc": datetime.now(UTC).isoformat(),
+            "last_updated_utc": _iso_now(),
         }
 
-        return json.dumps(result, indent=2)
+        return _dumps(result)
 
     except Exception as e:
-        return json.dumps({"error": str(e)})
+        return _dumps({"error": str(e)})
 
 
 @tool
-def get_top_card_offers(n: int = 5, card_type: str = "all") -> str:
+@_cached_result
+def get_top_card_offers(n: int = 5, card_type: str = "all", verbose: bool = False) -> str:
     """Get the top N credit card offers sorted by First Year Value Estimate.
 
     Use this when users ask about best current credit card offers, top sign-up
     bonuses, or highest value cards to apply for. Returns cards ranked by their
-    first year value estimate.
+    first year value estimate, with short tags naming their key benefits; call
+    get_credit_card_info with the card_name for a card's full details.
 
     Args:
         n: Number of top offers to return (default: 5)
         card_type: Filter by 'business', 'personal', or 'all' (default: 'all')
+        verbose: Include each card's full benefits instead of key benefit tags
 
     Returns:
         JSON string with 'offers' key containing list of top card offers
@@ -517,190 +644,185 @@ def get_top_card_offers(n: int = 5, card_type: str = "all") -> str:
     try:
         # Input validation
         if not isinstance(n, int) or n < 1:
-            return json.dumps({"error": "n must be a positive integer"})
+            return _dumps({"error": "n must be a positive integer"})
 
         if n > 50:
             n = 50  # Cap at 50 to prevent resource exhaustion
 
-        if card_type not in ["business", "personal", "all"]:
-            return json.dumps({"error": "card_type must be 'business', 'personal', or 'all'"})
+        if card_type not in _VALID_CARD_TYPES:
+            return _dumps({"error": "card_type must be 'business', 'personal', or 'all'"})
 
-        cards = data_storage.get_credit_cards()
+        # Cards are ranked by first year value once per data file version, so only the
+        # top n are turned into offers
+        search_index = data_storage.get_card_search_index()
+        cards = search_index["cards"]
         offers = []
 
-        for card in cards:
-            # Filter by card type
-            dataset_card_type = card.get("card_type", "").lower()
-            if card_type == "business" and dataset_card_type != "business":
-                continue
-            if card_type == "personal" and dataset_card_type != "personal":
-                continue
-
-            # Must have a first year value estimate
-            fyve = card.get("first_year_value_estimate")
-            if fyve is None:
-                continue
-
-            try:
-                fyve_num = float(fyve)
-            except (ValueError, TypeError):
-                continue
-
-            offers.append(
-                {
-                    "card_name": card.get("card_name"),
-                    "issuer": card.get("issuer"),
-                    "first_year_value_estimate": fyve_num,
-                    "sign_up_bonus": card.get("sign_up_bonus"),
-                    "annual_fee": card.get("annual_fee"),
-                    "application_link": card.get("application_link"),
-                    "rewards_currency_type": card.get("rewards_currency"),
-                    "benefits": card.get("benefits"),
-                    "fm_mini_review": card.get("fm_mini_review"),
-                }
-            )
-
-        # Sort by first year value, descending
-        offers.sort(key=lambda x: x["first_year_value_estimate"], reverse=True)
+        for i, fyve_num in search_index["offer_ranking"][card_type][:n]:
+            card = cards[i]
+            offer = {
+                "card_name": card.get("card_name"),
+                "issuer": card.get("issuer"),
+                "first_year_value_estimate": fyve_num,
+                "sign_up_bonus": card.get("sign_up_bonus"),
+                "annual_fee": card.get("annual_fee"),
+                "application_link": card.get("application_link"),
+                "rewards_currency_type": card.get("rewards_currency"),
+            }
+            if verbose:
+                offer["benefits"] = card.get("benefits")
+            else:
+                offer["key_benefit_tags"] = search_index["benefit_tags"][i]
+            offer["fm_mini_review"] = card.get("fm_mini_review")
+            offers.append(offer)
 
-        result = {"offers": offers[:n]}
-        return json.dumps(result, indent=2)
+        result = {"offers": offers}
+        return _dumps(result)
 
     except Exception as e:
-        return json.dumps({"error": str(e)})
+        return _dumps({"error": str(e)})
 
 
 @tool
-def benefits_search(query: str) -> str:
+@_cached_result
+def benefits_search(query: str, verbose: bool = False) -> str:
     """Search for credit cards that offer a specific benefit.
 
     Use this to find cards with specific perks like lounge access, credits,
-    protections, or elite status.
+    protections, or elite status. Each match includes the benefit that matched;
+    call get_credit_card_info with the card_name for a card's full details.
 
     Args:
         query: Benefit to search for (e.g., "Priority Pass", "cell phone protection", "lounge access")
+        verbose: Include each card's full benefits and review instead of only the matched benefit
 
     Returns:
-        JSON string with matching cards and their benefits
+        JSON string with matching cards and the benefit each one matched on
     """
     try:
         # Input validation
         if not query or not isinstance(query, str):
-            return json.dumps({"error": "Invalid query: must be a non-empty string"})
+            return _dumps({"error": "Invalid query: must be a non-empty string"})
 
         if len(query) > 500:
-            return json.dumps({"error": "Query too long (max 500 characters)"})
+            return _dumps({"error": "Query too long (max 500 characters)"})
 
-        cards = data_storage.get_credit_cards()
+        search_index = data_storage.get_card_search_index()
+        cards = search_index["cards"]
         query_lower = query.lower()
+
+        # Check if query is asking for a specific status category
+        query_words = query_lower.split()
+        target_categories = []
+        remaining_words = []
+
+        for word in query_words:
+            if word in _STATUS_CATEGORY_KEYWORDS:
+                target_categories.append(_STATUS_CATEGORY_KEYWORDS[word])
+            elif word not in _STATUS_WORDS:  # Skip structural words
+                remaining_words.append(word)
+
+        status_query = bool(target_categories) or not _STATUS_WORDS.isdisjoint(query_words)
+
+        # Plain text queries can only match cards whose benefit text contains every trigram of
+        # the query. Status queries match on structure, so they still check every card.
+        card_ids = (
+            None if status_query else data_storage.trigram_candidates(search_index["benefit_trigrams"], query_lower)
+        )
+        if card_ids is None:
+            card_ids = range(len(cards))
+
+        benefit_blobs = search_index["benefit_blobs"]
+        summaries = search_index["summaries"]
+        # Benefit text is lowercased once per data file version
+        benefit_columns = search_index["benefit_columns"]
+        # Which status categories each card has, as bits of data_storage.STATUS_CATEGORY_BITS
+        status_masks = search_index["status_masks"]
+        status_blobs = search_index["status_blobs"]
+        target_mask = 0
+        for category in target_categories:
+            target_mask |= data_storage.STATUS_CATEGORY_BITS[category]
         matches = []
 
-        for card in cards:
+        for i in card_ids:
+            # A plain text query can only match a card whose benefit text contains it
+            if not status_query and query_lower not in benefit_blobs[i]:
+                continue
+
+            card = cards[i]
             benefits = card.get("benefits", {})
-            matched = False
+            columns = benefit_columns[i]
+            # The benefit entry (or status list) that matched, keyed by its benefits section
+            matched = None
 
             # Search in credits
-            for credit in benefits.get("credits", []):
-                if query_lower in credit.get("type", "").lower():
-                    matched = True
+            for credit_type, credit in columns["credits"]:
+                if query_lower in credit_type:
+                    matched = {"credits": credit}
                     break
 
             # Search in lounge access
             if not matched:
-                for lounge in benefits.get("lounge", []):
-                    if query_lower in lounge.get("type", "").lower():
-                        matched = True
+                for lounge_type, lounge in columns["lounge"]:
+                    if query_lower in lounge_type:
+                        matched = {"lounge": lounge}
                         break
 
             # Search in other benefits
             if not matched:
-                for other in benefits.get("other", []):
-                    if query_lower in other.lower():
-                        matched = True
+                for other_lower, other in columns["other"]:
+                    if query_lower in other_lower:
+                        matched = {"other": other}
                         break
 
             # Search in protections
             if not matched:
-                protections = benefits.get("protections", {})
-                for prot_category in ["purchase_protections", "travel_protections", "insurance_protections"]:
-                    for prot in protections.get(prot_category, []):
-                        prot_type = prot.get("type", "").lower()
-                        prot_desc = prot.get("description", "").lower()
-                        if query_lower in prot_type or query_lower in prot_desc:
-                            matched = True
-                            break
-                    if matched:
+                for prot_category, prot_type, prot_desc, prot in columns["protections"]:
+                    if query_lower in prot_type or query_lower in prot_desc:
+                        matched = {prot_category: prot}
                         break
 
             # Search in elite status - use structured data properly
             if not matched:
                 status = benefits.get("status", {})
-
-                # Map query terms to status categories
-                category_keywords = {
-                    "hotel": "hotel_elite_status",
-                    "airline": "airline_elite_status",
-                    "rental": "rental_car_elite_status",
-                    "car": "rental_car_elite_status",
-                }
-
-                # Check if query is asking for a specific status category
-                query_words = query_lower.split()
-                target_categories = []
-                remaining_words = []
-
-                for word in query_words:
-                    if word in category_keywords:
-                        target_categories.append(category_keywords[word])
-                    elif word not in ["elite", "status"]:  # Skip structural words
-                        remaining_words.append(word)
+                status_mask = status_masks[i]
 
                 # If query contains category keywords (like "airline" or "hotel"),
                 # return ALL cards with that status type (not just keyword-matched ones)
                 if target_categories:
-                    for category in target_categories:
-                        if status.get(category) and len(status.get(category, [])) > 0:
-                            matched = True
-                            break
+                    if status_mask & target_mask:
+                        for category in target_categories:
+                            if status_mask & data_storage.STATUS_CATEGORY_BITS[category]:
+                                matched = {category: status[category]}
+                                break
                 # If no specific category but query contains "status" or "elite",
                 # check if card has ANY elite status
-                elif any(word in query_words for word in ["status", "elite"]):
-                    for status_category in [
-                        "hotel_elite_status",
-                        "airline_elite_status",
-                        "rental_car_elite_status",
-                        "other_elite_status",
-                    ]:
-                        if status.get(status_category) and len(status.get(status_category, [])) > 0:
+                elif status_query:
+                    for status_category in data_storage.STATUS_CATEGORIES:
+                        if status_mask & data_storage.STATUS_CATEGORY_BITS[status_category]:
                             # If there are remaining search words, do keyword match
                             if remaining_words:
-                                for stat in status.get(status_category, []):
-                                    stat_text = f"{stat.get('program', '')} {stat.get('tier', '')} {stat.get('description', '')}".lower()
+                                for stat_text, _, stat in columns["status"][status_category]:
                                     if any(word in stat_text for word in remaining_words):
-                                        matched = True
+                                        matched = {status_category: stat}
                                         break
                             else:
                                 # No additional keywords - match any card with status
-                                matched = True
+                                matched = {status_category: status[status_category]}
                                 break
                         if matched:
                             break
-                else:
-                    # Fallback to keyword search for non-status queries
-                    for status_category in [
-                        "hotel_elite_status",
-                        "airline_elite_status",
-                        "rental_car_elite_status",
-                        "other_elite_status",
-                    ]:
-                        for stat in status.get(status_category, []):
-                            if query_lower in str(stat).lower():
-                                matched = True
+                # Fallback to keyword search for non-status queries
+                elif query_lower in status_blobs[i]:
+                    for status_category in data_storage.STATUS_CATEGORIES:
+                        for _, stat_repr, stat in columns["status"][status_category]:
+                            if query_lower in stat_repr:
+                                matched = {status_category: stat}
                                 break
                         if matched:
                             break
 
-            if matched:
+            if matched and verbose:
                 matches.append(
                     {
                         "card_name": card.get("card_name"),
@@ -714,55 +836,127 @@ def benefits_search(query: str) -> str:
                         "last_updated_utc": card.get("last_updated_utc"),
                     }
                 )
+            elif matched:
+                matches.append({**summaries[i], "matched_benefit": matched})
 
         result = {
             "matches": matches,
             "query": query,
             "total_matches": len(matches),
-            "last_updated_utc": datetime.now(UTC).isoformat(),
+            "last_updated_utc": _iso_now(),
         }
 
-        return json.dumps(result, indent=2)
+        return _dumps(result)
 
     except Exception as e:
-        return json.dumps({"error": str(e)})
+        return _dumps({"error": str(e)})
 
 
 # RAG documentation search
 _doc_index = None
 _doc_search_tool = None
 
+# Process that initialized the RAG index; a forked child has a different PID and initializes its own
+_rag_init_pid: int | None = None
+
+# Set while a background RAG index update is running
+_rag_refresh_running = threading.Event()
+_rag_refresh_lock = threading.Lock()
+
+
+_DOC_SEARCH_DESCRIPTION = (
+    "Search 16,000+ indexed documents from trusted credit card and travel rewards blogs. "
+    "ALWAYS use this BEFORE web search. This is your PRIMARY knowledge base for: "
+    "redemption strategies, award booking tips, program policies (cancellation fees, change fees, etc.), "
+    "airline/hotel program nuances, and 'how to' questions. Try 1-2 different search queries "
+    "with varied keywords before considering web search."
+)
+
+
+def _create_doc_search_tool(doc_index):
+    """Create the doc_search tool over a RAG index using llm-tools-server's factory function."""
+    from llm_tools_server import create_doc_search_tool
+
+    return create_doc_search_tool(doc_index, name="doc_search", description=_DOC_SEARCH_DESCRIPTION)
+
+
+def _refresh_rag_index(build_index: Callable[[], Any]) -> None:
+    """Build an updated RAG index next to the loaded one and swap it in once complete.
+
+    Searches keep using the loaded index until then. The swap replaces the doc_search
+    tool's function, so the tool object the server already holds picks it up.
+    """
+    global _doc_index
+
+    try:
+        fresh_index = build_index()
+        fresh_index.crawl_and_index()
+        search = _create_doc_search_tool(fresh_index).func
+        _doc_index = fresh_index
+        if _doc_search_tool is not None:
+            _doc_search_tool.func = search
+        logger.info("RAG index updated")
+    except Exception as e:
+        logger.warning("Error updating RAG index: %s", e)
+    finally:
+        _rag_refresh_running.clear()
+
+
+def _start_rag_refresh(build_index: Callable[[], Any]) -> bool:
+    """Start building an updated RAG index in the background unless one is already running.
 
-def initialize_rag_at_startup() -> None:
+    Returns True if an update was started.
+    """
+    with _rag_refresh_lock:
+        if _rag_refresh_running.is_set():
+            return False
+        _rag_refresh_running.set()
+    threading.Thread(target=_refresh_rag_index, args=(build_index,), daemon=True, name="RAGRefresh").start()
+    return True
+
+
+def _warm_rag_index(doc_index) -> None:
+    """Run a throwaway search so the first doc_search call doesn't pay the models' warm-up cost."""
+    try:
+        doc_index.search("warmup", top_k=1)
+    except Exception as e:
+        logger.warning("RAG warm-up search failed: %s", e)
+
+
+def initialize_rag_at_startup(output: TextIO | None = None) -> None:
     """Initialize RAG index at startup if enabled.
 
     This ensures the index is built before the first request,
     avoiding delays for the first user. Creates a doc_search tool
-    that the model can use to search documentation.
+    that the model can use to search documentation. Progress messages
+    are written to output (stdout by default).
     """
+    global _rag_init_pid
+
     if not config.RAG_ENABLED:
-        print("RAG disabled (set RAG_ENABLED=true to enable)")
+        print("RAG disabled (set RAG_ENABLED=true to enable)", file=output)
+        return
+    if _rag_init_pid == os.getpid():
         return
 
     try:
-        from llm_tools_server import create_doc_search_tool
         from llm_tools_server.rag import DocSearchIndex, RAGConfig
 
         global _doc_index, _doc_search_tool
 
         # Validate that RAG sources are configured
         if not config.RAG_DOC_SOURCES or not config.RAG_DOC_SOURCES[0]:
-            print("\nWarning: RAG_ENABLED=true but RAG_DOC_SOURCES not configured")
-            print("  Set RAG_DOC_SOURCES in .env (comma-separated URLs)")
+            print("\nWarning: RAG_ENABLED=true but RAG_DOC_SOURCES not configured", file=output)
+            print("  Set RAG_DOC_SOURCES in .env (comma-separated URLs)", file=output)
             return
 
-        print("")
-        print("=" * 60)
-        print("⏳ PLEASE WAIT: Loading indexes may take a few minutes")
-        print("=" * 60)
-        print("")
-        print("Initializing documentation search index...")
-        print(f"  Sources: {', '.join(config.RAG_DOC_SOURCES)}")
+        print("", file=output)
+        print("=" * 60, file=output)
+        print("⏳ PLEASE WAIT: Loading indexes may take a few minutes", file=output)
+        print("=" * 60, file=output)
+        print("", file=output)
+        print("Initializing documentation search index...", file=output)
+        print(f"  Sources: {', '.join(config.RAG_DOC_SOURCES)}", file=output)
 
         rag_config = RAGConfig(
             base_url=config.RAG_DOC_SOURCES[0],
@@ -773,12 +967,15 @@ def initialize_rag_at_startup() -> None:
             rate_limit_delay=config.RAG_RATE_LIMIT_DELAY,
             max_workers=config.RAG_MAX_WORKERS,
             max_pages=config.RAG_MAX_PAGES,
-            url_include_patterns=config.RAG_URL_INCLUDE_PATTERNS,
-            url_exclude_patterns=config.RAG_URL_EXCLUDE_PATTERNS,
+            # Combined patterns so the crawler runs one regex search per URL instead of one per pattern
+            url_include_patterns=[config.RAG_URL_INCLUDE_RE.pattern] if config.RAG_URL_INCLUDE_RE else [],
+            url_exclude_patterns=[config.RAG_URL_EXCLUDE_RE.pattern] if config.RAG_URL_EXCLUDE_RE else [],
             hybrid_bm25_weight=config.RAG_BM25_WEIGHT,
             hybrid_semantic_weight=config.RAG_SEMANTIC_WEIGHT,
             search_top_k=config.RAG_TOP_K,
+            retriever_candidate_multiplier=config.RAG_CANDIDATE_MULTIPLIER,
             rerank_enabled=config.RAG_RERANK_ENABLED,
+            rerank_model=config.RAG_RERANK_MODEL,
             embedding_model=config.RAG_EMBEDDING_MODEL,
             update_check_interval_hours=config.RAG_UPDATE_INTERVAL_HOURS,
             # Periodic updates for long-running applications
@@ -787,50 +984,46 @@ def initialize_rag_at_startup() -> None:
         )
 
         _doc_index = DocSearchIndex(rag_config)
+        needs_update = _doc_index.needs_update()
 
-        if _doc_index.needs_update():
-            print("Building RAG index (this may take a few minutes)...")
+        refresh = False
+        if needs_update and not _doc_index.chunks_file.exists():
+            # Nothing cached to search while rebuilding, so the first build has to finish first
+            print("Building RAG index (this may take a few minutes)...", file=output)
             _doc_index.crawl_and_index()
-            print("✓ RAG index built successfully")
+            print("✓ RAG index built successfully", file=output)
         else:
-            print("Loading cached RAG index...")
+            print("Loading cached RAG index...", file=output)
             _doc_index.load_index()
-            print("✓ RAG index loaded successfully")
-
-        # Create the doc_search tool using llm-tools-server's factory function
-        _doc_search_tool = create_doc_search_tool(
-            _doc_index,
-            name="doc_search",
-            description=(
-                "Search 16,000+ indexed documents from trusted credit card and travel rewards blogs. "
-                "ALWAYS use this BEFORE web search. This is your PRIMARY knowledge base for: "
-                "redemption strategies, award booking tips, program policies (cancellation fees, change fees, etc.), "
-                "airline/hotel program nuances, and 'how to' questions. Try 1-2 different search queries "
-                "with varied keywords before considering web search."
-            ),
-        )
-        print("✓ doc_search tool enabled")
+            print("✓ RAG index loaded successfully", file=output)
+            # Serve the stale index while a new one is built, unless the periodic updater
+            # that load_index() started will refresh it
+            refresh = needs_update and not config.RAG_PERIODIC_UPDATE_ENABLED
+
+        _doc_search_tool = _create_doc_search_tool(_doc_index)
+        print("✓ doc_search tool enabled", file=output)
+        if refresh and _start_rag_refresh(functools.partial(DocSearchIndex, rag_config)):
+            print("  Updating RAG index in the background...", file=output)
+        _rag_init_pid = os.getpid()
+        threading.Thread(target=_warm_rag_index, args=(_doc_index,), daemon=True, name="RAGWarmup").start()
 
         # Log periodic update status
         if config.RAG_PERIODIC_UPDATE_ENABLED:
-            print(f"✓ Periodic updates enabled (every {config.RAG_PERIODIC_UPDATE_INTERVAL_HOURS}h)")
+            print(f"✓ Periodic updates enabled (every {config.RAG_PERIODIC_UPDATE_INTERVAL_HOURS}h)", file=output)
 
     except ImportError as e:
-        print(f"\nWarning: RAG dependencies not available: {e}")
-        print("  Install with: uv sync --extra rag")
+        print(f"\nWarning: RAG dependencies not available: {e}", file=output)
+        print("  Install with: uv sync --extra rag", file=output)
     except Exception as e:
-        print(f"\nError initializing RAG: {e}")
+        print(f"\nError initializing RAG: {e}", file=output)
 
 
 # =============================================================================
 # Tool Exports
 # =============================================================================
 
-# Create web search tool (requires config for API key)
-web_search = create_web_search_tool(config)
-
 # Miles-specific tools
-MILES_TOOLS = [
+MILES_TOOLS = (
     get_user_data,
     get_valuations,
     get_credit_card_info,
@@ -839,7 +1032,23 @@ MILES_TOOLS = [
     get_transfer_bonuses,
     get_top_card_offers,
     benefits_search,
-]
+)
+
+# Builtins from llm-tools-server, Miles tools and web search, built on first use so
+# importing this module doesn't construct the web search tool
+_static_tools: tuple | None = None
+
+# get_all_tools result including the doc_search tool, built once that tool exists
+_all_tools_cache: tuple | None = None
+
+
+def _get_static_tools() -> tuple:
+    """Get the tools that don't depend on RAG, creating the web search tool (requires config) once."""
+    global _static_tools
+
+    if _static_tools is None:
+        _static_tools = (*BUILTIN_TOOLS, *MILES_TOOLS, create_web_search_tool(config))
+    return _static_tools
 
 
 def get_all_tools():
@@ -851,16 +1060,22 @@ def get_all_tools():
     - Config-dependent tools (web_search)
     - Dynamically initialized tools (doc_search if RAG enabled)
     """
-    tools = list(BUILTIN_TOOLS)  # Start with builtin tools from llm-tools-server
-    tools.extend(MILES_TOOLS)  # Add Miles-specific tools
-    tools.append(web_search)  # Add web search (requires config)
-
-    # Add doc search tool if RAG is enabled and initialized
-    if _doc_search_tool is not None:
-        tools.append(_doc_search_tool)
+    global _all_tools_cache
 
-    return tools
+    static_tools = _get_static_tools()
 
-
-# For backward compatibility - basic tools available at import time
-ALL_TOOLS = list(BUILTIN_TOOLS) + MILES_TOOLS + [web_search]
+    # Add doc search tool if RAG is enabled and initialized
+    if _doc_search_tool is None:
+        return static_tools
+    if _all_tools_cache is None or _all_tools_cache[-1] is not _doc_search_tool:
+        _all_tools_cache = (*static_tools, _doc_search_tool)
+    return _all_tools_cache
+
+
+def __getattr__(name: str):
+    """Create web_search and ALL_TOOLS (basic tools, for backward compatibility) on first access."""
+    if name == "web_search":
+        return _get_static_tools()[-1]
+    if name == "ALL_TOOLS":
+        return _get_static_tools()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")